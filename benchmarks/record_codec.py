@@ -0,0 +1,88 @@
+"""Compare the record codec with the string-splitting implementation it replaced.
+
+Run from the repository root: ``python -m benchmarks.record_codec``
+"""
+
+import datetime
+import random
+import re
+import timeit
+
+from utils.record_codec import format_record, parse_record
+
+N = 10_000
+
+
+def legacy_is_time_format(s):
+    return bool(
+        re.compile(
+            r"(?<!.)(\d{1,2})?:?(\d{2})?:?(?<!\d)(\d{1,2})\.?\d{1,2}?(?!.)"
+        ).match(s)
+    )
+
+
+def legacy_time_convert(time_input):
+    negative = time_input[0] == "-"
+    time_list = time_input.split(":")
+    if len(time_list) == 1:
+        return float(time_list[0])
+    sign = -1 if negative else 1
+    if len(time_list) == 2:
+        return float(int(time_list[0]) * 60 + sign * float(time_list[1]))
+    if len(time_list) == 3:
+        return float(
+            int(time_list[0]) * 3600
+            + sign * int(time_list[1]) * 60
+            + sign * float(time_list[2])
+        )
+
+
+def legacy_display_record(record):
+    negative = float(record) < 0
+    if negative:
+        record = -record
+    str_dt = str(datetime.timedelta(seconds=record))
+    if str_dt.count(".") == 1:
+        return ("-" if negative else "") + str_dt[:-4]
+    return ("-" if negative else "") + str_dt + ".00"
+
+
+def main():
+    rng = random.Random(0)
+    records = [
+        round(rng.uniform(-600, 200_000), rng.choice((0, 2, 3, 6))) for _ in range(N)
+    ]
+    records += [0, 5, 0.005, 0.0000005, 0.0000015, 59.995, 86399.999999, 86400]
+    texts = [legacy_display_record(record) for record in records]
+    texts = [text for text in texts if "day" not in text]
+
+    for record in records:
+        assert format_record(record) == legacy_display_record(record), record
+    for text in texts:
+        assert parse_record(text) == legacy_time_convert(text), text
+
+    results = {
+        "display_record (legacy)": (
+            lambda: [legacy_display_record(r) for r in records],
+            len(records),
+        ),
+        "format_record": (lambda: [format_record(r) for r in records], len(records)),
+        "is_time_format + time_convert (legacy)": (
+            lambda: [
+                legacy_is_time_format(t) and legacy_time_convert(t) for t in texts
+            ],
+            len(texts),
+        ),
+        "time_convert (legacy)": (
+            lambda: [legacy_time_convert(t) for t in texts],
+            len(texts),
+        ),
+        "parse_record": (lambda: [parse_record(t) for t in texts], len(texts)),
+    }
+    for name, (fn, count) in results.items():
+        best = min(timeit.repeat(fn, number=10, repeat=5)) / 10
+        print(f"{name:<40}{best / count * 1e6:8.3f} us/record")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,7 @@ from discord.ext import commands
 from pymongo import ASCENDING, DESCENDING
 
 import internal.constants as constants
-from internal.database import MapData
+from internal.database import MapData, MapSummary, creator_tokens
 from utils.embeds import doom_embed
 from utils.map_utils import convert_short_types, searchmap
 
@@ -195,12 +195,19 @@ class MapSearchTypes(commands.Cog, name="Map Search Types"):
             await ctx.send("No latest maps!", delete_after=10)
 
     @commands.command(
-        help="Search for maps by a specific creator.\n<creator> is not case-sensitive and can contain a portion of a name.",
+        help="Search for maps by a specific creator.\n<creator> is not case-sensitive and can be the start of a name.",
         brief="Search for maps by a specific creator",
     )
     async def creator(self, ctx, creator):
         """Search for and display maps by a certain creator."""
-        query = {"creator": re.compile(re.escape(creator), re.IGNORECASE)}
+        query = {
+            "creator_tokens": {
+                "$all": [
+                    re.compile(f"^{re.escape(token)}")
+                    for token in creator_tokens(creator)
+                ]
+            }
+        }
         if creator.lower() == "diaz":
             creator = "DiaZ"
             await searchmap(ctx, query, creator=creator)
@@ -215,13 +222,13 @@ class MapSearchTypes(commands.Cog, name="Map Search Types"):
     async def mapcode(self, ctx, map_code):
         """Search for and display a certain map code."""
         code = map_code.upper().replace('O', '0')
-        query = {"code": code}
+        summary = await MapSummary.get(code)
         embed = None
-        async for entry in MapData.find(query):
+        if summary and summary.map_name:
             embed = doom_embed("Map Code")
             embed.add_field(
-                name=f"{entry.code} - {constants.PRETTY_NAMES[entry.map_name]}",
-                value=f"> Creator: {entry.creator}\n> Map Types: {', '.join(entry.type)}\n> Description: {entry.desc}",
+                name=f"{summary.code} - {constants.PRETTY_NAMES[summary.map_name]}",
+                value=f"> Creator: {summary.creator}\n> Map Types: {', '.join(summary.type)}\n> Description: {summary.desc}",
                 inline=False,
             )
         if embed:
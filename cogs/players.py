@@ -0,0 +1,28 @@
+from logging import getLogger
+
+import discord
+from discord.ext import commands
+
+from internal.database import Players
+
+logger = getLogger(__name__)
+
+
+class PlayerSync(commands.Cog, name="Player Sync"):
+    """Keep stored player names in sync with Discord."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.Cog.listener(name="on_user_update")
+    async def sync_player_name(self, before: discord.User, after: discord.User):
+        if before.name == after.name:
+            return
+        if not await Players.collection.count_documents({"_id": after.id}, limit=1):
+            return
+        await Players.sync(after.id, after.name, old_name=before.name)
+
+
+def setup(bot):
+    """Add Cog to Discord bot."""
+    bot.add_cog(PlayerSync(bot))
@@ -15,6 +15,7 @@ from utils.map_utils import (
     map_submit_embed,
     map_type_check,
 )
+from utils.records import map_changed
 from utils.utilities import delete_messages
 from utils.views import Confirm
 
@@ -169,6 +170,7 @@ class SubmitMap(commands.Cog, name="Map submission/deletion/editing"):
 
         elif view.value:  # Accept
             await submission.commit()
+            await map_changed(submission.code)
             new_map_channel = self.bot.get_channel(constants_bot.NEW_MAPS_CHANNEL_ID)
             new_map = await new_map_channel.send(embed=embed)
             await new_map.start_thread(name=f"Discuss {map_code} here.")
@@ -212,6 +214,7 @@ class SubmitMap(commands.Cog, name="Map submission/deletion/editing"):
             pass
         elif view.value:  # Accept
             await search.delete()
+            await map_changed(search.code)
         else:  # Reject
             pass
 
@@ -255,6 +258,7 @@ class SubmitMap(commands.Cog, name="Map submission/deletion/editing"):
             pass
         elif view.value:  # Accept
             await search.commit()
+            await map_changed(search.code)
         else:  # Reject
             pass
 
@@ -315,6 +319,7 @@ class SubmitMap(commands.Cog, name="Map submission/deletion/editing"):
             pass
         elif view.value:  # Accept
             await search.commit()
+            await map_changed(search.code)
         else:  # Reject
             pass
 
@@ -370,6 +375,8 @@ class SubmitMap(commands.Cog, name="Map submission/deletion/editing"):
             pass
         elif view.value:  # Accept
             await search.commit()
+            await map_changed(map_code)
+            await map_changed(new_map_code)
         else:  # Reject
             pass
 
@@ -415,6 +422,7 @@ class SubmitMap(commands.Cog, name="Map submission/deletion/editing"):
             pass
         elif view.value:  # Accept
             await search.commit()
+            await map_changed(search.code)
         else:  # Reject
             pass
 
@@ -1,17 +1,23 @@
 import asyncio
-import re
 import sys
 
 import discord
-from aiostream import stream
 from discord.ext import commands
-from pymongo.collation import Collation
 
-from internal.database import WorldRecords
+from internal.database import (
+    MapSummary,
+    Players,
+    WorldRecords,
+    backfill_done,
+    mark_backfill_done,
+    normalize_level,
+)
 from utils.embeds import doom_embed
 from utils.form import Form
 from utils.map_utils import map_code_regex
-from utils.pb_utils import display_record, time_convert
+from utils.members import ambiguous_players
+from utils.pb_utils import display_record, is_time_format, time_convert
+from utils.records import records_changed
 from utils.views import Confirm, Verification
 
 if len(sys.argv) > 1:
@@ -20,12 +26,61 @@ if len(sys.argv) > 1:
 else:
     from internal import constants_bot_prod as constants_bot
 
+LEVEL_NAMES_LIMIT = 1000
+VERIFICATION_VIEWS = "VerificationViews"
+
 
 class SubmitPersonalBest(commands.Cog, name="Personal best submission/deletion"):
     """Commands to submit and delete personal bests."""
 
     def __init__(self, bot):
         self.bot = bot
+        self.verification = Verification(bot)
+        bot.add_view(self.verification)
+        asyncio.get_event_loop().create_task(self._upgrade_pending())
+
+    async def _upgrade_pending(self):
+        await self._classify_unverified()
+        await self._attach_verification()
+
+    async def _classify_unverified(self):
+        """Sort unverified records saved before rejections were stored.
+
+        Both were saved as unverified. A pending record still has its notice in
+        the hidden verification channel, which is deleted once it is handled.
+        """
+        legacy = {"verified": False, "rejected": {"$exists": False}}
+        if not await WorldRecords.collection.count_documents(legacy, limit=1):
+            return
+        channel = self.bot.get_channel(constants_bot.HIDDEN_VERIFICATION_CHANNEL)
+        if channel is None:
+            return
+        notices = [message.id async for message in channel.history(limit=None)]
+        await WorldRecords.collection.update_many(
+            {**legacy, "hidden_id": {"$in": notices}}, {"$set": {"rejected": False}}
+        )
+        await WorldRecords.collection.update_many(legacy, {"$set": {"rejected": True}})
+
+    async def _attach_verification(self):
+        """Put the persistent buttons on submissions sent before they existed.
+
+        Runs once; the buttons sent since then survive restarts on their own.
+        """
+        if await backfill_done(VERIFICATION_VIEWS):
+            return
+        async for record in WorldRecords.collection.find(
+            {"verified": False, "rejected": False},
+            {"message_id": True, "url": True},
+        ):
+            channel = self.bot.get_channel(int(record["url"].split("/")[-2]))
+            if channel is None:
+                continue
+            message = channel.get_partial_message(record["message_id"])
+            try:
+                await message.edit(view=self.verification)
+            except discord.HTTPException:
+                pass
+        await mark_backfill_done(VERIFICATION_VIEWS)
 
     async def cog_check(self, ctx):
         """Check if channel is RECORD_CHANNEL."""
@@ -71,7 +126,7 @@ class SubmitPersonalBest(commands.Cog, name="Personal best submission/deletion")
             form.add_question(
                 question="What is your personal best record (HH:MM:SS.ss format)?",
                 key="record",
-                validation=time_convert,
+                validation=is_time_format,
             )
 
             result = await form.execute()
@@ -87,29 +142,31 @@ class SubmitPersonalBest(commands.Cog, name="Personal best submission/deletion")
         map_code = map_code.upper().replace('O', '0').replace("\"", "")
         level = level.upper().replace("\"", "")
         record_in_seconds = time_convert(record.replace("\"", ""))
+        if record_in_seconds is None:
+            await ctx.send("Invalid time. Use HH:MM:SS.ss format.", delete_after=15)
+            return
 
         # Find currently associated levels
-        level_checker = {}
-        async for entry in (
-            WorldRecords.find({"code": map_code})
-            .sort([("level", 1), ("record", 1)])
-            .collation(Collation(locale="en_US", numericOrdering=True))
-        ):
-            if entry.level.upper() not in level_checker.keys():
-                level_checker[entry.level.upper()] = None
+        summary = await MapSummary.get(map_code)
+        level_checker = summary.levels if summary else []
+
+        # Keep the level list well inside the 1024 character field limit.
+        level_names = ", ".join(level_checker) if level_checker else "N/A"
+        if len(level_names) > LEVEL_NAMES_LIMIT:
+            level_names = level_names[:LEVEL_NAMES_LIMIT].rsplit(", ", 1)[0] + ", …"
 
         # init embed
         embed = doom_embed(title=f"New Submission - {ctx.author.name}")
         embed.add_field(
-            name="Currently submitted level names:",
-            value=f"{', '.join(level_checker) if level_checker else 'N/A'}",
+            name=f"Currently submitted level names ({len(level_checker)}):",
+            value=level_names,
         )
 
         # Finds document
         submission = await WorldRecords.find_one(
             {
                 "code": map_code,
-                "level": re.compile(f"^{re.escape(level)}$", re.IGNORECASE),
+                "level_key": normalize_level(level),
                 "posted_by": ctx.author.id,
             }
         )
@@ -184,49 +241,32 @@ class SubmitPersonalBest(commands.Cog, name="Personal best submission/deletion")
                 submission.url = ctx.message.jump_url
                 submission.name = ctx.author.name
                 submission.verified = False
+                submission.rejected = False
                 submission.hidden_id = hidden_msg.id
 
                 # Save document
                 await submission.commit()
-
-                # Find top 10 records and display submission's place in top 10.
-                top_10 = (
-                    WorldRecords.find(
-                        {
-                            "code": map_code,
-                            "level": re.compile(f"^{re.escape(level)}$", re.IGNORECASE),
-                        }
-                    )
-                    .sort("record", 1)
-                    .limit(10)
+                await Players.sync(ctx.author.id, ctx.author.name)
+                await records_changed(
+                    submission.code, submission.level_key, submission.posted_by
                 )
-                en = stream.enumerate(top_10)
-                async with en.stream() as streamer:
-                    async for rank, entry in streamer:
-                        if submission:
-                            if entry.pk == submission.pk:
-                                await ctx.channel.send(
-                                    f"Your rank is {rank + 1} on the unverified scoreboard."
-                                )
 
-                verify = Verification(msg, self.bot)
+                rank = await WorldRecords.rank(
+                    submission.code, submission.level_key, submission.record
+                )
+                await ctx.channel.send(
+                    f"Your rank is {rank} on the unverified scoreboard."
+                )
 
                 try:
                     await ctx.message.delete()
                 except Exception:
                     pass
                 await msg.edit(
-                    content="Waiting to be verified...", embed=embed, view=verify
+                    content="Waiting to be verified...",
+                    embed=embed,
+                    view=self.verification,
                 )
-                await verify.wait()
-
-                if verify.verify:
-                    await msg.edit(content="Verified.", view=verify)
-                    await msg.add_reaction(emoji="<:upper:787788134620332063>")
-                elif not verify.verify:
-                    await msg.edit(content="Verification rejected", view=verify)
-                else:
-                    await msg.edit(content="Verification error", view=verify)
 
         elif not view.value:
             await msg.edit(
@@ -259,23 +299,22 @@ class SubmitPersonalBest(commands.Cog, name="Personal best submission/deletion")
 
         # Searches for author PB if none provided
         if name == "":
-            name = ctx.author.name
-            name_id = ctx.author.id
-            search = await WorldRecords.find_one(
-                {
-                    "code": map_code,
-                    "level": re.compile(f"^{re.escape(level)}$", re.IGNORECASE),
-                    "$or": [{"posted_by": name_id}, {"name": name}],
-                }
-            )
+            user_id = ctx.author.id
         else:
-            search = await WorldRecords.find_one(
-                {
-                    "code": map_code,
-                    "level": re.compile(f"^{re.escape(level)}$", re.IGNORECASE),
-                    "name": name,
-                }
-            )
+            players = await Players.resolve(name)
+            if len(players) > 1:
+                await ctx.channel.send(
+                    ambiguous_players(name, players), delete_after=15
+                )
+                return
+            user_id = players[0][0] if players else None
+        search = await WorldRecords.find_one(
+            {
+                "code": map_code,
+                "level_key": normalize_level(level),
+                "posted_by": user_id,
+            }
+        )
 
         if not search:
             m = await ctx.channel.send(
@@ -329,6 +368,9 @@ class SubmitPersonalBest(commands.Cog, name="Personal best submission/deletion")
                 pass
             finally:
                 await search.delete()
+                await records_changed(
+                    search.code, normalize_level(search.level), search.posted_by
+                )
 
         elif not view.value:
             await msg.edit(content="Personal best was not deleted.", delete_after=20)
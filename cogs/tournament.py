@@ -1,31 +1,42 @@
 import asyncio
-import datetime
+import functools
 import sys
 from logging import getLogger
 
 import dateparser
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 
 from internal.database import (
     BonusData,
     HardcoreData,
     MildcoreData,
+    Players,
     Schedule,
     TimeAttackData,
     TopThree,
 )
+from internal.database_init import change_streams, pool_metrics
 from utils.embeds import doom_embed, hall_of_fame
+from utils.members import resolver
 from utils.multiple_choice import MultipleChoice
 from utils.pb_utils import display_record, time_convert
+from utils.scheduler import STARTED, TournamentScheduler
+from utils.submission_queue import SubmissionQueue
 from utils.tournament_utils import (
+    CATEGORY_DATA,
+    apply_permissions,
+    archive_round,
     category_sort,
     confirm_collection_drop,
+    export_round,
     exporter,
-    lock_unlock,
+    live_boards,
     mentions_to_list,
     single_exporter,
+    submit_record,
     tournament_boards,
+    update_podiums,
 )
 from utils.tourrnament_wizard import TournamentWizard
 from utils.views import Confirm, Paginator, TournamentChoices, TournamentChoicesNoAll
@@ -38,6 +49,8 @@ else:
 
 logger = getLogger(__name__)
 
+BUSY_MESSAGE = "Submissions are busy right now. Please try again in a moment."
+
 
 def viewable_channels():
     def predicate(ctx):
@@ -56,10 +69,13 @@ class Tournament(commands.Cog, name="Tournament"):
 
     def __init__(self, bot):
         self.bot = bot
-        self.schedule_cache = None
 
-        logger.info("schedule_checker has started.")
-        self.schedule_checker.start()
+        self.scheduler = TournamentScheduler(self._scheduled_start, self._scheduled_end)
+        self.scheduler.start()
+        logger.info("Tournament scheduler has started.")
+
+        self.submissions = SubmissionQueue(CATEGORY_DATA)
+        self.submissions.start()
         self.guild = self.bot.get_guild(constants_bot.GUILD_ID)
 
         self.ta_channel = self.guild.get_channel(constants_bot.TA_CHANNEL_ID)
@@ -82,6 +98,28 @@ class Tournament(commands.Cog, name="Tournament"):
             constants_bot.BRACKET_TOURNAMENT_ROLE_ID
         )
 
+        self.category_roles = {
+            self.ta_channel: self.ta_role,
+            self.mc_channel: self.mc_role,
+            self.hc_channel: self.hc_role,
+            self.bonus_channel: self.bonus_role,
+        }
+
+        asyncio.get_event_loop().create_task(
+            live_boards.start(
+                self.guild.get_channel(constants_bot.TOURNAMENT_CHAT_CHANNEL_ID)
+            )
+        )
+        # Keep the live boards in sync with writes made by other instances.
+        self.change_handlers = {
+            document.opts.collection_name: functools.partial(
+                live_boards.on_change, category
+            )
+            for category, document in CATEGORY_DATA.items()
+        }
+        for collection_name, handler in self.change_handlers.items():
+            change_streams.register(collection_name, handler)
+
     def cog_check(self, ctx):
         if ctx.channel.id in [
             constants_bot.TOURNAMENT_CHAT_CHANNEL_ID,
@@ -95,56 +133,48 @@ class Tournament(commands.Cog, name="Tournament"):
         ]:
             return True
 
-    @tasks.loop(seconds=30)
-    async def schedule_checker(self):
-        self.schedule_cache = Schedule.find({})
-        count = await Schedule.count_documents({})
-
-        if count:
-            current_time = datetime.datetime.now()
-
-            async for s in self.schedule_cache:
-                if s.start_time is not None and (
-                    current_time
-                    >= s.start_time
-                    != datetime.datetime(year=1, month=1, day=1)
-                ):
-                    logger.info("Starting scheduled tournament.")
-                    await self._start_round(s.mentions, s.embed_dict)
-                    s.start_time = datetime.datetime(year=1, month=1, day=1)
-                    await s.commit()
-
-                if current_time >= s.schedule:
-                    logger.info("Ending scheduled tournament.")
-                    await self._end_round(s.mentions)
-                    await s.delete()
+    async def _set_submissions(self, channels, unlock):
+        """Lock/unlock channels for their category, trifecta and bracket roles at once."""
+        await apply_permissions(
+            (channel, role, unlock)
+            for channel in channels
+            for role in (
+                self.category_roles[channel],
+                self.trifecta_role,
+                self.bracket_role,
+            )
+        )
+
+    def cog_unload(self):
+        self.scheduler.stop()
+        self.submissions.stop()
+        for collection_name, handler in self.change_handlers.items():
+            change_streams.unregister(collection_name, handler)
+
+    async def _scheduled_start(self, s):
+        await self._start_round(s.mentions, s.embed_dict)
+        s.start_time = STARTED
+        await s.commit()
+
+    async def _scheduled_end(self, s):
+        await self._end_round(s.mentions)
+        await s.delete()
 
     async def _start_round(self, mentions, embed_dict):
         list_mentions = mentions_to_list(mentions)
 
+        changes = []
         if constants_bot.BRACKET_TOURNAMENT_ROLE_ID in list_mentions:
-            await lock_unlock(self.ta_channel, self.bracket_role, unlock=True)
-            await lock_unlock(self.mc_channel, self.bracket_role, unlock=True)
-            await lock_unlock(self.hc_channel, self.bracket_role, unlock=True)
-            await lock_unlock(self.bonus_channel, self.bracket_role, unlock=True)
+            changes += [(c, self.bracket_role, True) for c in self.category_roles]
 
         if constants_bot.TRIFECTA_ROLE_ID in list_mentions:
-            await lock_unlock(self.ta_channel, self.trifecta_role, unlock=True)
-            await lock_unlock(self.mc_channel, self.trifecta_role, unlock=True)
-            await lock_unlock(self.hc_channel, self.trifecta_role, unlock=True)
-            await lock_unlock(self.bonus_channel, self.trifecta_role, unlock=True)
-
-        if constants_bot.TA_ROLE_ID in list_mentions:
-            await lock_unlock(self.ta_channel, self.ta_role, unlock=True)
+            changes += [(c, self.trifecta_role, True) for c in self.category_roles]
 
-        if constants_bot.MC_ROLE_ID in list_mentions:
-            await lock_unlock(self.mc_channel, self.mc_role, unlock=True)
+        for channel, role in self.category_roles.items():
+            if role is not None and role.id in list_mentions:
+                changes.append((channel, role, True))
 
-        if constants_bot.HC_ROLE_ID in list_mentions:
-            await lock_unlock(self.hc_channel, self.hc_role, unlock=True)
-
-        if constants_bot.BONUS_ROLE_ID in list_mentions:
-            await lock_unlock(self.bonus_channel, self.bonus_role, unlock=True)
+        await apply_permissions(changes)
 
         start_announcement = discord.Embed.from_dict(embed_dict)
         await self.info_channel.send(f"{mentions}", embed=start_announcement)
@@ -152,81 +182,32 @@ class Tournament(commands.Cog, name="Tournament"):
     async def _end_round(self, mentions):
         list_mentions = mentions_to_list(mentions)
 
-        await TopThree.collection.drop()
-
-        top_three = TopThree(
-            **{
-                "ta_podium": [0],
-                "mc_podium": [0],
-                "hc_podium": [0],
-                "bonus_podium": [0],
-            }
-        )
-        await top_three.commit()
-
-        bracket = False
-        if constants_bot.BRACKET_TOURNAMENT_ROLE_ID in list_mentions:
-            bracket = True
-            await lock_unlock(self.ta_channel, self.bracket_role, unlock=False)
-            await lock_unlock(self.mc_channel, self.bracket_role, unlock=False)
-            await lock_unlock(self.hc_channel, self.bracket_role, unlock=False)
-            await lock_unlock(self.bonus_channel, self.bracket_role, unlock=False)
-
-        trifecta = False
-        if constants_bot.TRIFECTA_ROLE_ID in list_mentions:
-            trifecta = True
-            await lock_unlock(self.ta_channel, self.trifecta_role, unlock=False)
-            await lock_unlock(self.mc_channel, self.trifecta_role, unlock=False)
-            await lock_unlock(self.hc_channel, self.trifecta_role, unlock=False)
-            await lock_unlock(self.bonus_channel, self.trifecta_role, unlock=False)
-
-        if constants_bot.TA_ROLE_ID in list_mentions or any([bracket, trifecta]):
-            await lock_unlock(self.ta_channel, self.ta_role, unlock=False)
-
-            await self.export_channel.send(f"***{10 * '-'}TIME ATTACK{10 * '-'}***")
-            await tournament_boards("TIMEATTACK", guild=self.guild)
-            await exporter(
-                "TIMEATTACK",
-                self.export_channel,
-                guild=self.guild,
-            )
-            await TimeAttackData.collection.drop()
-
-        if constants_bot.MC_ROLE_ID in list_mentions or any([bracket, trifecta]):
-            await lock_unlock(self.mc_channel, self.mc_role, unlock=False)
-
-            await self.export_channel.send(f"***{10 * '-'}MILDCORE{10 * '-'}***")
-            await tournament_boards("MILDCORE", guild=self.guild)
-            await exporter(
-                "MILDCORE",
-                self.export_channel,
-                guild=self.guild,
-            )
-            await MildcoreData.collection.drop()
-
-        if constants_bot.HC_ROLE_ID in list_mentions or any([bracket, trifecta]):
-            await lock_unlock(self.hc_channel, self.hc_role, unlock=False)
-
-            await self.export_channel.send(f"***{10 * '-'}HARDCORE{10 * '-'}***")
-            await tournament_boards("HARDCORE", guild=self.guild)
-            await exporter(
-                "HARDCORE",
-                self.export_channel,
-                guild=self.guild,
-            )
-            await HardcoreData.collection.drop()
-
-        if constants_bot.BONUS_ROLE_ID in list_mentions or any([bracket, trifecta]):
-            await lock_unlock(self.bonus_channel, self.bonus_role, unlock=False)
-
-            await self.export_channel.send(f"***{10 * '-'}BONUS{10 * '-'}***")
-            await tournament_boards("BONUS", guild=self.guild)
-            await exporter(
-                "BONUS",
-                self.export_channel,
-                guild=self.guild,
+        bracket = constants_bot.BRACKET_TOURNAMENT_ROLE_ID in list_mentions
+        trifecta = constants_bot.TRIFECTA_ROLE_ID in list_mentions
+
+        changes = []
+        if bracket:
+            changes += [(c, self.bracket_role, False) for c in self.category_roles]
+        if trifecta:
+            changes += [(c, self.trifecta_role, False) for c in self.category_roles]
+        for channel, role in self.category_roles.items():
+            if role is not None and (role.id in list_mentions or bracket or trifecta):
+                changes.append((channel, role, False))
+        await apply_permissions(changes)
+
+        categories = [
+            category
+            for category, role_id in (
+                ("TIMEATTACK", constants_bot.TA_ROLE_ID),
+                ("MILDCORE", constants_bot.MC_ROLE_ID),
+                ("HARDCORE", constants_bot.HC_ROLE_ID),
+                ("BONUS", constants_bot.BONUS_ROLE_ID),
             )
-            await BonusData.collection.drop()
+            if role_id in list_mentions or bracket or trifecta
+        ]
+        await update_podiums(categories)
+        await export_round(categories, self.guild, self.export_channel)
+        await archive_round(categories)
 
         end_announcement = doom_embed(title=f"Tournament Announcement")
         end_announcement.add_field(
@@ -259,49 +240,22 @@ class Tournament(commands.Cog, name="Tournament"):
             await ctx.send("Invalid time. Map submission rejected.")
             return
 
-        # Finds document
-        if category == "TIMEATTACK":
-            _category_data = TimeAttackData
-        elif category == "MILDCORE":
-            _category_data = MildcoreData
-        elif category == "HARDCORE":
-            _category_data = HardcoreData
-        else:  # "BONUS"
-            _category_data = BonusData
-
-        search = await _category_data.find_one({"posted_by": ctx.author.id})
-
-        # If document is found, verifies if submitted time is faster (if verified).
-        if (search and (record_in_seconds >= search.record)) is True:
+        # Verifies the submitted time is faster than the current one, if any.
+        current = await live_boards.get(category, ctx.author.id)
+        if current and record_in_seconds >= current.record:
             await ctx.channel.send(
                 "Times submitted for the tournament needs to be faster than prior submissions."
             )
             return
 
-        # Create new TournamentData document, if none exists.
-        if not search:
-            if category == "TIMEATTACK":
-                _new_submission = TimeAttackData
-            elif category == "MILDCORE":
-                _new_submission = MildcoreData
-            elif category == "HARDCORE":
-                _new_submission = HardcoreData
-            else:  # "BONUS"
-                _new_submission = BonusData
-
-            search = _new_submission(
-                **{
-                    "posted_by": ctx.author.id,
-                    "name": ctx.author.name,
-                    "record": record_in_seconds,
-                    "attachment_url": ctx.message.attachments[0].url,
-                }
-            )
+        if self.submissions.full(category):
+            await ctx.send(BUSY_MESSAGE, delete_after=15)
+            return
 
         embed = doom_embed(title="New Submission")
         # Verification embed for user.
         embed.add_field(
-            name=f"Name: {discord.utils.find(lambda m: m.id == search.posted_by, ctx.guild.members).name}",
+            name=f"Name: {resolver.name(ctx.guild, ctx.author.id, ctx.author.name)}",
             value=(
                 f"> Category: {category}\n"
                 f"> Record: {display_record(record_in_seconds)}\n"
@@ -314,13 +268,39 @@ class Tournament(commands.Cog, name="Tournament"):
         await view.wait()
 
         if view.value:
-            await msg.edit(content="Submission accepted", delete_after=15, view=view)
-            # Update record
-            search.record = record_in_seconds
-            search.name = ctx.author.name
-            search.attachment_url = ctx.message.attachments[0].url
-            # Save document
-            await search.commit()
+
+            async def process(stage):
+                async with stage("db"):
+                    accepted = await submit_record(
+                        category,
+                        ctx.author.id,
+                        ctx.author.name,
+                        record_in_seconds,
+                        ctx.message.attachments[0].url,
+                    )
+                if not accepted:
+                    async with stage("discord"):
+                        await msg.edit(
+                            content="Times submitted for the tournament needs to be faster than prior submissions.",
+                            delete_after=15,
+                            view=view,
+                        )
+                    return
+                live_boards.submit(
+                    category, ctx.author.id, ctx.author.name, record_in_seconds
+                )
+                rank = await live_boards.rank(category, record_in_seconds)
+                async with stage("discord"):
+                    await msg.edit(
+                        content=f"Submission accepted. Your rank is {rank}.",
+                        delete_after=15,
+                        view=view,
+                    )
+                async with stage("db"):
+                    await Players.sync(ctx.author.id, ctx.author.name)
+
+            if not self.submissions.put(category, process):
+                await msg.edit(content=BUSY_MESSAGE, delete_after=15, view=view)
 
         elif not view.value:
             await ctx.message.delete()
@@ -385,7 +365,7 @@ class Tournament(commands.Cog, name="Tournament"):
 
         embed = doom_embed(title="Submission deletion")
         embed.add_field(
-            name=f"Name: {discord.utils.find(lambda m: m.id == search.posted_by, ctx.guild.members).name}",
+            name=f"Name: {resolver.name(ctx.guild, search.posted_by, search.name)}",
             value=(
                 f"> Category: {category}\n"
                 f"> Record: {display_record(search.record)}\n"
@@ -402,6 +382,7 @@ class Tournament(commands.Cog, name="Tournament"):
                 content="Personal best deleted successfully.", delete_after=15, view=view
             )
             await search.delete()
+            live_boards.remove(category, search.posted_by)
         elif not view.value:
             await msg.edit(
                 content="Personal best was not deleted.", delete_after=15, view=view
@@ -591,6 +572,29 @@ class Tournament(commands.Cog, name="Tournament"):
             "BONUS", self.bot.get_channel(constants_bot.EXPORT_SS_CHANNEL_ID), ctx=ctx
         )
 
+    @commands.command(
+        name="queuestats",
+        help="[ORG ONLY] Shows submission queue depth, wait and processing times, member name cache hits and database connection pool usage",
+        brief="[ORG ONLY] Shows submission queue metrics",
+    )
+    @commands.has_role(constants_bot.ORG_ROLE_ID)
+    async def _queue_stats(self, ctx):
+        embed = doom_embed(title="Submission Queues")
+        sections = {
+            **self.submissions.stats(),
+            "Member Names": resolver.stats(),
+            "Database Pool": pool_metrics.snapshot(),
+        }
+        for category, stats in sections.items():
+            embed.add_field(
+                name=category,
+                value="\n".join(
+                    f"> {key}: {round(value)}" for key, value in stats.items()
+                ),
+                inline=False,
+            )
+        await ctx.send(embed=embed, delete_after=60)
+
     @commands.command(
         name="deletess",
         help="[ORG ONLY] Deletes all screenshots in export channel",
@@ -700,10 +704,7 @@ class Tournament(commands.Cog, name="Tournament"):
             elif view.value == 3:
                 await self._lock_bonus(ctx)
             elif view.value == 4:
-                await self._lock_ta(ctx)
-                await self._lock_mc(ctx)
-                await self._lock_hc(ctx)
-                await self._lock_bonus(ctx)
+                await self._lock_all(ctx)
 
     @lock.command(
         name="ta",
@@ -712,9 +713,7 @@ class Tournament(commands.Cog, name="Tournament"):
     )
     @commands.has_role(constants_bot.ORG_ROLE_ID)
     async def _lock_ta(self, ctx):
-        await lock_unlock(self.ta_channel, self.ta_role, unlock=False)
-        await lock_unlock(self.ta_channel, self.trifecta_role, unlock=False)
-        await lock_unlock(self.ta_channel, self.bracket_role, unlock=False)
+        await self._set_submissions([self.ta_channel], unlock=False)
         await ctx.send("Time attack locked.", delete_after=15)
 
     @lock.command(
@@ -724,9 +723,7 @@ class Tournament(commands.Cog, name="Tournament"):
     )
     @commands.has_role(constants_bot.ORG_ROLE_ID)
     async def _lock_mc(self, ctx):
-        await lock_unlock(self.mc_channel, self.mc_role, unlock=False)
-        await lock_unlock(self.mc_channel, self.trifecta_role, unlock=False)
-        await lock_unlock(self.mc_channel, self.bracket_role, unlock=False)
+        await self._set_submissions([self.mc_channel], unlock=False)
         await ctx.send("Mildcore locked.", delete_after=15)
 
     @lock.command(
@@ -736,9 +733,7 @@ class Tournament(commands.Cog, name="Tournament"):
     )
     @commands.has_role(constants_bot.ORG_ROLE_ID)
     async def _lock_hc(self, ctx):
-        await lock_unlock(self.hc_channel, self.hc_role, unlock=False)
-        await lock_unlock(self.hc_channel, self.trifecta_role, unlock=False)
-        await lock_unlock(self.hc_channel, self.bracket_role, unlock=False)
+        await self._set_submissions([self.hc_channel], unlock=False)
         await ctx.send("Hardcore locked.", delete_after=15)
 
     @lock.command(
@@ -747,9 +742,7 @@ class Tournament(commands.Cog, name="Tournament"):
     )
     @commands.has_role(constants_bot.ORG_ROLE_ID)
     async def _lock_bonus(self, ctx):
-        await lock_unlock(self.bonus_channel, self.bonus_role, unlock=False)
-        await lock_unlock(self.bonus_channel, self.trifecta_role, unlock=False)
-        await lock_unlock(self.bonus_channel, self.bracket_role, unlock=False)
+        await self._set_submissions([self.bonus_channel], unlock=False)
         await ctx.send("Bonus locked.", delete_after=15)
 
     @lock.command(
@@ -758,24 +751,10 @@ class Tournament(commands.Cog, name="Tournament"):
     )
     @commands.has_role(constants_bot.ORG_ROLE_ID)
     async def _lock_all(self, ctx):
-        await lock_unlock(self.ta_channel, self.ta_role, unlock=False)
-        await lock_unlock(self.ta_channel, self.trifecta_role, unlock=False)
-        await lock_unlock(self.ta_channel, self.bracket_role, unlock=False)
+        await self._set_submissions(self.category_roles, unlock=False)
         await ctx.send("Time attack locked.", delete_after=15)
-
-        await lock_unlock(self.mc_channel, self.mc_role, unlock=False)
-        await lock_unlock(self.mc_channel, self.trifecta_role, unlock=False)
-        await lock_unlock(self.mc_channel, self.bracket_role, unlock=False)
         await ctx.send("Mildcore locked.", delete_after=15)
-
-        await lock_unlock(self.hc_channel, self.hc_role, unlock=False)
-        await lock_unlock(self.hc_channel, self.trifecta_role, unlock=False)
-        await lock_unlock(self.hc_channel, self.bracket_role, unlock=False)
         await ctx.send("Hardcore locked.", delete_after=15)
-
-        await lock_unlock(self.bonus_channel, self.bonus_role, unlock=False)
-        await lock_unlock(self.bonus_channel, self.trifecta_role, unlock=False)
-        await lock_unlock(self.bonus_channel, self.bracket_role, unlock=False)
         await ctx.send("Bonus locked.", delete_after=15)
 
     @commands.group(
@@ -802,10 +781,7 @@ class Tournament(commands.Cog, name="Tournament"):
             elif view.value == 3:
                 await self._unlock_bonus(ctx)
             elif view.value == 4:
-                await self._unlock_ta(ctx)
-                await self._unlock_mc(ctx)
-                await self._unlock_hc(ctx)
-                await self._unlock_bonus(ctx)
+                await self._unlock_all(ctx)
 
     @unlock.command(
         name="ta",
@@ -814,9 +790,7 @@ class Tournament(commands.Cog, name="Tournament"):
     )
     @commands.has_role(constants_bot.ORG_ROLE_ID)
     async def _unlock_ta(self, ctx):
-        await lock_unlock(self.ta_channel, self.ta_role, unlock=True)
-        await lock_unlock(self.ta_channel, self.trifecta_role, unlock=True)
-        await lock_unlock(self.ta_channel, self.bracket_role, unlock=True)
+        await self._set_submissions([self.ta_channel], unlock=True)
         await ctx.send("Time attack unlocked.", delete_after=15)
 
     @unlock.command(
@@ -826,9 +800,7 @@ class Tournament(commands.Cog, name="Tournament"):
     )
     @commands.has_role(constants_bot.ORG_ROLE_ID)
     async def _unlock_mc(self, ctx):
-        await lock_unlock(self.mc_channel, self.mc_role, unlock=True)
-        await lock_unlock(self.mc_channel, self.trifecta_role, unlock=True)
-        await lock_unlock(self.mc_channel, self.bracket_role, unlock=True)
+        await self._set_submissions([self.mc_channel], unlock=True)
         await ctx.send("Mildcore unlocked.", delete_after=15)
 
     @unlock.command(
@@ -838,9 +810,7 @@ class Tournament(commands.Cog, name="Tournament"):
     )
     @commands.has_role(constants_bot.ORG_ROLE_ID)
     async def _unlock_hc(self, ctx):
-        await lock_unlock(self.hc_channel, self.hc_role, unlock=True)
-        await lock_unlock(self.hc_channel, self.trifecta_role, unlock=True)
-        await lock_unlock(self.hc_channel, self.bracket_role, unlock=True)
+        await self._set_submissions([self.hc_channel], unlock=True)
         await ctx.send("Hardcore unlocked.", delete_after=15)
 
     @unlock.command(
@@ -849,9 +819,7 @@ class Tournament(commands.Cog, name="Tournament"):
     )
     @commands.has_role(constants_bot.ORG_ROLE_ID)
     async def _unlock_bonus(self, ctx):
-        await lock_unlock(self.bonus_channel, self.bonus_role, unlock=True)
-        await lock_unlock(self.bonus_channel, self.trifecta_role, unlock=True)
-        await lock_unlock(self.bonus_channel, self.bracket_role, unlock=True)
+        await self._set_submissions([self.bonus_channel], unlock=True)
         await ctx.send("Bonus unlocked.", delete_after=15)
 
     @unlock.command(
@@ -860,24 +828,10 @@ class Tournament(commands.Cog, name="Tournament"):
     )
     @commands.has_role(constants_bot.ORG_ROLE_ID)
     async def _unlock_all(self, ctx):
-        await lock_unlock(self.ta_channel, self.ta_role, unlock=True)
-        await lock_unlock(self.ta_channel, self.trifecta_role, unlock=True)
-        await lock_unlock(self.ta_channel, self.bracket_role, unlock=True)
+        await self._set_submissions(self.category_roles, unlock=True)
         await ctx.send("Time attack locked.", delete_after=15)
-
-        await lock_unlock(self.mc_channel, self.mc_role, unlock=True)
-        await lock_unlock(self.mc_channel, self.trifecta_role, unlock=True)
-        await lock_unlock(self.mc_channel, self.bracket_role, unlock=True)
         await ctx.send("Mildcore locked.", delete_after=15)
-
-        await lock_unlock(self.hc_channel, self.hc_role, unlock=True)
-        await lock_unlock(self.hc_channel, self.trifecta_role, unlock=True)
-        await lock_unlock(self.hc_channel, self.bracket_role, unlock=True)
         await ctx.send("Hardcore locked.", delete_after=15)
-
-        await lock_unlock(self.bonus_channel, self.bonus_role, unlock=True)
-        await lock_unlock(self.bonus_channel, self.trifecta_role, unlock=True)
-        await lock_unlock(self.bonus_channel, self.bracket_role, unlock=True)
         await ctx.send("Bonus locked.", delete_after=15)
 
     @commands.command(
@@ -910,6 +864,7 @@ class Tournament(commands.Cog, name="Tournament"):
         if view.value:
             wizard.schedule.embed_dict = embed.to_dict()
             await wizard.schedule.commit()
+            self.scheduler.notify()
             if result["start_time"] is not None:
                 await confirmation_msg.edit(
                     content=f"Scheduled tournament confirmed for {result['start_time_datetime'].strftime('%m/%d/%Y at approx. %H:%M %Z')}",
@@ -993,6 +948,7 @@ class Tournament(commands.Cog, name="Tournament"):
             return
         choice_number = int(answer[0]) - 1
         await schedules[choice_number].delete()
+        self.scheduler.notify()
         await ctx.message.delete()
 
     @commands.command(name="changetime", help="", brief="", aliases=["change"])
@@ -1042,6 +998,7 @@ class Tournament(commands.Cog, name="Tournament"):
         if view.value:
             schedules[choice_number].schedule = time
             await schedules[choice_number].commit()
+            self.scheduler.notify()
 
         elif not view.value:
             await confirmation_msg.edit(
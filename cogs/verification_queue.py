@@ -0,0 +1,179 @@
+import asyncio
+import sys
+from logging import getLogger
+
+import discord
+from discord.ext import commands
+
+from internal.database import WorldRecords, normalize_level
+from utils.embeds import doom_embed
+from utils.pb_utils import display_record
+from utils.profiles import profiles
+from utils.records import records_changed
+from utils.views import VerificationQueue
+
+if len(sys.argv) > 1:
+    if sys.argv[1] == "test":
+        from internal import constants_bot_test as constants_bot
+else:
+    from internal import constants_bot_prod as constants_bot
+
+logger = getLogger(__name__)
+
+QUEUE_PAGE_SIZE = 25
+
+PENDING = {"verified": False, "rejected": False}
+
+
+class VerificationQueueCog(commands.Cog, name="Verification Queue"):
+    """Verify or reject pending personal bests in bulk."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def _pending_page(self, after=None):
+        """Next page of pending submissions, oldest first."""
+        query = dict(PENDING)
+        if after is not None:
+            query["_id"] = {"$gt": after}
+        return (
+            await WorldRecords.collection.find(
+                query,
+                {
+                    "name": True,
+                    "code": True,
+                    "level": True,
+                    "posted_by": True,
+                    "record": True,
+                    "url": True,
+                    "message_id": True,
+                    "hidden_id": True,
+                },
+            )
+            .sort("_id", 1)
+            .limit(QUEUE_PAGE_SIZE)
+            .to_list(length=QUEUE_PAGE_SIZE)
+        )
+
+    async def _delete_hidden(self, hidden_ids):
+        """Bulk delete verification notices, one by one if they are too old."""
+        channel = self.bot.get_channel(constants_bot.HIDDEN_VERIFICATION_CHANNEL)
+        for i in range(0, len(hidden_ids), 100):
+            chunk = [
+                channel.get_partial_message(message_id)
+                for message_id in hidden_ids[i : i + 100]
+            ]
+            try:
+                await channel.delete_messages(chunk)
+            except discord.HTTPException:
+                for message in chunk:
+                    try:
+                        await message.delete()
+                    except discord.HTTPException:
+                        pass
+
+    async def _update_messages(self, records, verified):
+        """Edit the original submission messages to show the outcome."""
+        for record in records:
+            channel = self.bot.get_channel(int(record["url"].split("/")[-2]))
+            if channel is None:
+                continue
+            message = channel.get_partial_message(record["message_id"])
+            try:
+                if verified:
+                    await message.edit(content="Verified.", view=None)
+                    await message.add_reaction(emoji="<:upper:787788134620332063>")
+                else:
+                    await message.edit(content="Verification rejected", view=None)
+            except discord.HTTPException:
+                pass
+
+    async def resolve(self, records, verified):
+        """Verify or reject many pending submissions.
+
+        Records another moderator handled since the page was shown are left
+        alone, and only those resolved here get their messages and caches
+        updated.
+        """
+        results = await asyncio.gather(
+            *(
+                WorldRecords.collection.find_one_and_update(
+                    {"_id": record["_id"], **PENDING},
+                    {"$set": {"verified": verified, "rejected": not verified}},
+                    {"_id": True},
+                )
+                for record in records
+            )
+        )
+        records = [record for record, result in zip(records, results) if result]
+        if not records:
+            return 0
+        await self._delete_hidden(
+            [record["hidden_id"] for record in records if record.get("hidden_id")]
+        )
+        levels = {
+            (record["code"], normalize_level(record["level"])) for record in records
+        }
+        await asyncio.gather(*(records_changed(*level) for level in levels))
+        profiles.invalidate(*{record["posted_by"] for record in records})
+        asyncio.get_event_loop().create_task(self._update_messages(records, verified))
+        return len(records)
+
+    @commands.command(
+        name="verifyqueue",
+        aliases=["vq"],
+        help="[MOD ONLY] Page through unverified personal bests, oldest first, and verify or reject many at once.",
+        brief="[MOD ONLY] Bulk verify personal bests",
+    )
+    @commands.has_any_role(*constants_bot.ROLE_WHITELIST)
+    async def verifyqueue(self, ctx):
+        await ctx.message.delete()
+        msg = None
+        after = None
+        while True:
+            page = await self._pending_page(after)
+            if not page:
+                content = "No submissions are waiting for verification."
+                if msg:
+                    await msg.edit(content=content, embed=None, view=None)
+                else:
+                    await ctx.send(content, delete_after=15)
+                return
+
+            embed = doom_embed(title="Verification Queue")
+            for i, record in enumerate(page, start=1):
+                embed.add_field(
+                    name=f"{i}. {record['name']}",
+                    value=(
+                        f"> Code: {record['code']}\n"
+                        f"> Level: {record['level'].upper()}\n"
+                        f"> Record: {display_record(record['record'])}\n"
+                        f"> [Submission]({record['url']})"
+                    ),
+                    inline=True,
+                )
+            view = VerificationQueue(ctx.author, page)
+            if msg:
+                await msg.edit(content=None, embed=embed, view=view)
+            else:
+                msg = await ctx.send(embed=embed, view=view)
+            await view.wait()
+
+            if view.action is None:
+                await msg.delete()
+                return
+            if view.action == "next":
+                after = page[-1]["_id"]
+                continue
+
+            verified = view.action == "verify"
+            count = await self.resolve(view.selected, verified)
+            await ctx.send(
+                f"{count} submission(s) {'verified' if verified else 'rejected'}.",
+                delete_after=15,
+            )
+
+
+def setup(bot):
+    """Add Cog to Discord bot."""
+    bot.add_cog(VerificationQueueCog(bot))
@@ -1,20 +1,26 @@
 import asyncio
-import re
 import sys
 from logging import getLogger
 
 import bson
 import discord
-import pymongo
 from discord.ext import commands
-from natsort import natsorted
 from pymongo.collation import Collation
 
 import internal.constants as constants
-from internal.database import MapData, WorldRecords
+from internal.database import (
+    Leaderboards,
+    MapSummary,
+    Players,
+    WorldRecords,
+    normalize_level,
+)
+from internal.database_init import change_streams
 from utils.embeds import doom_embed
-from utils.pb_utils import boards, display_record
-from utils.views import Paginator
+from utils.members import ambiguous_players, resolver
+from utils.pages import EmbedPages, send_pages
+from utils.pb_utils import boards, display_record, personal_bests
+from utils.profiles import profiles
 
 if len(sys.argv) > 1:
     if sys.argv[1] == "test":
@@ -32,6 +38,16 @@ class ViewPersonalBest(commands.Cog, name="Personal bests and leaderboards"):
 
     def __init__(self, bot):
         self.bot = bot
+        change_streams.register(WorldRecords.opts.collection_name, profiles.on_change)
+        change_streams.register(
+            Leaderboards.opts.collection_name, profiles.on_leaderboard_change
+        )
+
+    def cog_unload(self):
+        change_streams.unregister(WorldRecords.opts.collection_name, profiles.on_change)
+        change_streams.unregister(
+            Leaderboards.opts.collection_name, profiles.on_leaderboard_change
+        )
 
     async def cog_check(self, ctx):
         """Check if channel is RECORD_CHANNEL."""
@@ -48,102 +64,43 @@ class ViewPersonalBest(commands.Cog, name="Personal bests and leaderboards"):
     )
     async def pb(self, ctx, name=None):
         """Display personal best of a particular user, or author of command."""
-        author = ctx.message.author
         await ctx.message.delete()
         # Query for own PBs (w/ no name arg) or another users PBs
         if name is None:
-            query = {
-                "$or": [
-                    {"posted_by": bson.int64.Int64(ctx.author.id)},
-                    {"name": ctx.author.name},
-                ]
-            }
+            query = {"posted_by": bson.int64.Int64(ctx.author.id)}
         else:
-            query = {"name": re.compile(re.escape(name), re.IGNORECASE)}
-
-        embed_dict = {}
-        cur_map = None
-        async for entry in WorldRecords.find(
-            query,
-            {
-                "_id": False,
-                "url": False,
-                "hidden_id": False,
-                "message_id": False,
-                "posted_by": False,
-            },
-        ).sort([("code", pymongo.ASCENDING), ("level", pymongo.ASCENDING)]):
-            # Find if map_code for PB is in MapData to display map name and creator name.
-            map_name = creator = None
-            if entry.code != cur_map:
-                cur_map = entry.code
-                map_data_connection = await MapData.find_one(
-                    {"code": entry.code},
-                    {"_id": False, "code": True, "map_name": True, "creator": True},
-                )
-                if map_data_connection:
-                    map_name = constants.PRETTY_NAMES[map_data_connection.map_name]
-                    creator = map_data_connection.creator
+            players = await Players.resolve(name) or await Players.resolve(
+                name, exact=False
+            )
+            if len(players) > 1:
+                await ctx.send(ambiguous_players(name, players), delete_after=15)
+                return
+            query = {"posted_by": players[0][0] if players else None}
+
+        async def rows():
+            async for map_pbs in personal_bests(query):
+                # Display map name and creator if map_code for PB is in MapData.
+                if map_pbs.get("map_name"):
+                    map_name = constants.PRETTY_NAMES[map_pbs["map_name"]]
+                    creator = map_pbs["creator"]
                 else:
                     map_name = "Needs Map"
                     creator = "Needs Author"
 
-            # Create a dict of all the individual map_codes and the PBs for each map_code
-            if embed_dict.get(str(entry.code), None) is None:
-                embed_dict[str(entry.code)] = {
-                    "title": f"{entry.code} - {map_name} by {creator}\n",
-                    "value": "",
-                }
-            embed_dict[str(entry.code)]["value"] += (
-                f"> **Level: {entry.level}**\n"
-                f"> Record: {display_record(entry.record)}\n"
-                f"> Verified: {constants.VERIFIED_EMOJI if entry.verified is True else constants.NOT_VERIFIED_EMOJI}\n"
-                f"━━━━━━━━━━━━\n"
-            )
-
-        embeds = []
-        embed = discord.Embed(title=name)
-
-        if len(embed_dict) > 0:
-            for i, map_pbs in enumerate(embed_dict.values()):
-                if len(map_pbs["value"]) > 1024:
-                    # if over 1024 char limit
-                    # split pbs dict value into list of individual pbs
-                    # and divide in half.. Add two fields instead of just one.
-                    delimiter_regex = r">.*\n>.*\n>.*\n━━━━━━━━━━━━\n"
-                    pb_split = re.findall(delimiter_regex, map_pbs["value"])
-                    pb_split = natsorted(pb_split)
-                    pb_split_1 = pb_split[: len(pb_split) // 2]
-                    pb_split_2 = pb_split[len(pb_split) // 2 :]
-                    embed.add_field(
-                        name=f"{map_pbs['title']} (1)",
-                        value="".join(pb_split_1),
-                        inline=False,
-                    )
-                    embed.add_field(
-                        name=f"{map_pbs['title']} (2)",
-                        value="".join(pb_split_2),
-                        inline=False,
-                    )
-                else:
-                    embed.add_field(
-                        name=map_pbs["title"], value=map_pbs["value"], inline=False
-                    )
-                if (i + 1) % 3 == 0 or (i + 1) == len(embed_dict):
-                    embeds.append(embed)
-                    embed = discord.Embed(title=name)
-
-        if len(embeds) > 1:
-            view = Paginator(embeds, author)
-            paginator = await ctx.send(embed=view.formatted_pages[0], view=view)
-            await view.wait()
-            await paginator.delete()
-
-        elif len(embeds) == 1:
-            await ctx.send(embed=embeds[0], delete_after=120)
+                # One field per map_code, split between PBs if it gets too long
+                yield (
+                    f"{map_pbs['_id']} - {map_name} by {creator}\n",
+                    [
+                        f"> **Level: {entry['level']}**\n"
+                        f"> Record: {display_record(entry['record'])}\n"
+                        f"> Verified: {constants.VERIFIED_EMOJI if entry['verified'] is True else constants.NOT_VERIFIED_EMOJI}\n"
+                        f"━━━━━━━━━━━━\n"
+                        for entry in map_pbs["records"]
+                    ],
+                )
 
-        else:
-            await ctx.send(f"Nothing exists for {name}!", delete_after=10)
+        pages = EmbedPages(lambda: discord.Embed(title=name), rows_per_page=3)
+        await send_pages(ctx, pages.stream(rows()), f"Nothing exists for {name}!")
 
     # view scoreboard
     @commands.command(
@@ -156,11 +113,7 @@ class ViewPersonalBest(commands.Cog, name="Personal bests and leaderboards"):
         await ctx.message.delete()
         map_code = map_code.upper().replace('O', '0')
         title = f"{map_code} - LEVEL {level.upper()} - TOP 10 VERIFIED/UNVERIFIED RECORDS:\n"
-        query = {
-            "code": map_code,
-            "level": re.compile(r"^" + re.escape(level) + r"$", re.IGNORECASE),
-        }
-        await boards(ctx, map_code, level, title, query)
+        await boards(ctx, map_code, level, title)
 
     # view leaderboard
     @commands.command(
@@ -173,12 +126,7 @@ class ViewPersonalBest(commands.Cog, name="Personal bests and leaderboards"):
         await ctx.message.delete()
         map_code = map_code.upper().replace('O', '0')
         title = f"{map_code} - LEVEL {level.upper()} - TOP 10 VERIFIED RECORDS:\n"
-        query = {
-            "code": map_code,
-            "level": re.compile(r"^" + re.escape(level) + r"$", re.IGNORECASE),
-            "verified": True,
-        }
-        await boards(ctx, map_code, level.upper(), title, query)
+        await boards(ctx, map_code, level.upper(), title, verified=True)
 
     @commands.command(
         help="View world record(s) for a particular map code.\n[level] is an optional argument that will display a single level's world record.\nIf [level] is included, command will show only that level's world record.",
@@ -194,57 +142,36 @@ class ViewPersonalBest(commands.Cog, name="Personal bests and leaderboards"):
         embed = None
         if level == "":
             title = f"{map_code} - VERIFIED WORLD RECORDS:\n"
-            level_checker = {}
             embed = doom_embed(title=f"{title}")
-            async for entry in (
-                WorldRecords.find({"code": map_code, "verified": True})
-                .sort([("level", 1), ("record", 1)])
+            await Leaderboards.ensure({"code": map_code})
+            async for board in (
+                Leaderboards.find({"code": map_code, "verified.0": {"$exists": True}})
+                .sort([("level", 1)])
                 .collation(Collation(locale="en_US", numericOrdering=True))
             ):
-                if entry.level.upper() not in level_checker.keys():
-                    level_checker[entry.level.upper()] = None
-                    exists = True
-                    try:
-                        name = discord.utils.find(
-                            lambda mem: mem.id == entry.posted_by, ctx.guild.members
-                        ).name
-                    except AttributeError:
-                        name = entry.name
-                    embed.add_field(
-                        name=f"Level {entry.level.upper()} - {name}",
-                        value=f"> Record: {display_record(entry.record)}\n",
-                        inline=False,
-                    )
+                entry = board.verified[0]
+                exists = True
+                name = resolver.name(ctx.guild, entry["posted_by"], entry["name"])
+                embed.add_field(
+                    name=f"Level {entry['level'].upper()} - {name}",
+                    value=f"> Record: {display_record(entry['record'])}\n",
+                    inline=False,
+                )
 
         else:
-            async for entry in (
-                WorldRecords.find(
-                    {
-                        "code": map_code,
-                        "level": re.compile(
-                            r"^" + re.escape(level) + r"$", re.IGNORECASE
-                        ),
-                        "verified": True,
-                    }
-                )
-                .sort("record", 1)
-                .limit(1)
-            ):
-                title = f"{map_code} - LEVEL {entry.level.upper()} - VERIFIED WORLD RECORD:\n"
+            board = await Leaderboards.get(map_code, normalize_level(level))
+            if board and board.verified:
+                entry = board.verified[0]
+                title = f"{map_code} - LEVEL {entry['level'].upper()} - VERIFIED WORLD RECORD:\n"
                 exists = True
-                try:
-                    name = discord.utils.find(
-                        lambda mem: mem.id == entry.posted_by, ctx.guild.members
-                    ).name
-                except AttributeError:
-                    name = entry.name
+                name = resolver.name(ctx.guild, entry["posted_by"], entry["name"])
                 embed = discord.Embed(title=f"{title}")
                 embed.add_field(
                     name=f"{name}",
-                    value=f"> Record: {display_record(entry.record)}\n",
+                    value=f"> Record: {display_record(entry['record'])}\n",
                     inline=False,
                 )
-                url = entry.url
+                url = entry["url"]
         if exists:
             await ctx.send(f"{url}", embed=embed, delete_after=120)
         else:
@@ -253,6 +180,43 @@ class ViewPersonalBest(commands.Cog, name="Personal bests and leaderboards"):
                 delete_after=10,
             )
 
+    @commands.command(
+        help="View a player's totals: personal bests, verified ratio, maps played and world records held.\n[name] is optional. Defaults to the user who used the command.",
+        brief="View a player's personal best totals",
+        aliases=["stats"],
+    )
+    async def profile(self, ctx, name=None):
+        """Display the totals of a particular user, or author of command."""
+        await ctx.message.delete()
+        if name is None:
+            user_id, fallback = ctx.author.id, ctx.author.name
+        else:
+            players = await Players.resolve(name) or await Players.resolve(
+                name, exact=False
+            )
+            if not players:
+                await ctx.send(f"Nothing exists for {name}!", delete_after=10)
+                return
+            if len(players) > 1:
+                await ctx.send(ambiguous_players(name, players), delete_after=15)
+                return
+            user_id, fallback = players[0]
+
+        stats = await profiles.get(user_id)
+        if not stats["pbs"]:
+            await ctx.send(f"Nothing exists for {fallback}!", delete_after=10)
+            return
+
+        embed = doom_embed(title=resolver.name(ctx.guild, user_id, fallback))
+        embed.add_field(name="Personal Bests", value=f"> {stats['pbs']}")
+        embed.add_field(
+            name="Verified",
+            value=f"> {stats['verified']} ({stats['verified'] / stats['pbs']:.0%})",
+        )
+        embed.add_field(name="Maps Played", value=f"> {stats['maps']}")
+        embed.add_field(name="World Records", value=f"> {stats['world_records']}")
+        await ctx.send(embed=embed, delete_after=60)
+
     @commands.command(
         help="Lists level names that are currently associated with <map_code>.",
         brief="Lists level names that are currently associated with <map_code>",
@@ -264,26 +228,20 @@ class ViewPersonalBest(commands.Cog, name="Personal bests and leaderboards"):
         map_code = map_code.upper().replace('O', '0')
         title = f"{map_code} - LEVEL NAMES:\n"
 
-        level_checker = {}
-        async for entry in (
-            WorldRecords.find({"code": map_code})
-            .sort([("level", 1)])
-            .collation(Collation(locale="en_US", numericOrdering=True))
-            .limit(30)
-        ):
-            if entry.level.upper() not in level_checker.keys():
-                level_checker[entry.level.upper()] = None
+        summary = await MapSummary.get(map_code)
+        level_checker = summary.levels if summary else []
 
-        if level_checker:
-            embed = doom_embed(title=f"{title}")
-            embed.add_field(
-                name="Currently submitted levels:", value=f"{', '.join(level_checker)}"
-            )
-
-            await ctx.send(embed=embed, delete_after=60)
+        async def rows():
+            if level_checker:
+                # Split between level names if the list is too long for one field
+                yield "Currently submitted levels:", [
+                    f"{level}, " for level in level_checker[:-1]
+                ] + [level_checker[-1]]
 
-        else:
-            await ctx.send(f"No level names found for {map_code}!", delete_after=10)
+        pages = EmbedPages(lambda: doom_embed(title=title))
+        await send_pages(
+            ctx, pages.stream(rows()), f"No level names found for {map_code}!"
+        )
 
 
 def setup(bot):
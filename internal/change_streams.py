@@ -0,0 +1,163 @@
+import asyncio
+import time
+from collections import defaultdict
+from logging import getLogger
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = getLogger(__name__)
+
+# Error codes of a server that is not a replica set member, and of a resume
+# token that has fallen off the oplog.
+NO_REPLICA_SET = 40573
+HISTORY_LOST = (280, 286)
+
+# operationType of the synthetic event sent when changes may have been missed.
+RESYNC = "resync"
+
+
+class ChangeStreams:
+    """Fan out database changes to in-process cache handlers.
+
+    Handlers are coroutine functions registered per collection name. They are
+    awaited in order with each change event, including this process's own
+    writes, or with a ``RESYNC`` event when changes may have been missed and
+    the cache should be rebuilt.
+
+    The resume token is saved at most every `save_interval` seconds, so a
+    restart resumes where the last run left off and replays at most that many
+    seconds of events. Registering a new collection also replays the events
+    seen since. Change streams need a replica set; without one the subscriber
+    stops and caches only see this process's writes.
+    """
+
+    def __init__(self, name="caches", save_interval=5, retry_delay=5):
+        self.name = name
+        self.save_interval = save_interval
+        self.retry_delay = retry_delay
+        self._handlers = defaultdict(list)
+        self._token = None
+        self._reopen = False
+        self._reopen_from = None
+        self._task = None
+
+    def register(self, collection_name, handler):
+        handlers = self._handlers[collection_name]
+        if handler in handlers:
+            return
+        if not handlers and not self._reopen:
+            # The stream only watches registered collections, so a new one
+            # reopens it from here. Later polls may already be past its changes.
+            self._reopen = True
+            self._reopen_from = self._token
+        handlers.append(handler)
+
+    def unregister(self, collection_name, handler):
+        handlers = self._handlers.get(collection_name, [])
+        if handler in handlers:
+            handlers.remove(handler)
+        if not handlers:
+            self._handlers.pop(collection_name, None)
+
+    def start(self):
+        self._task = asyncio.get_event_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    async def _dispatch(self, change):
+        for handler in list(self._handlers.get(change["ns"]["coll"], ())):
+            try:
+                await handler(change)
+            except Exception:
+                logger.exception(
+                    f"{change['ns']['coll']} change handler failed "
+                    f"on {change['operationType']}."
+                )
+
+    async def _resync(self):
+        for collection_name in list(self._handlers):
+            await self._dispatch(
+                {"operationType": RESYNC, "ns": {"coll": collection_name}}
+            )
+
+    # The database is imported on first use, so the fan out logic can be
+    # exercised with these three methods overridden and no server.
+    async def _load(self):
+        from internal.database import ChangeStreamTokens
+
+        stored = await ChangeStreamTokens.collection.find_one({"_id": self.name})
+        return stored["token"] if stored else None
+
+    async def _save(self, token):
+        from internal.database import ChangeStreamTokens
+
+        await ChangeStreamTokens.collection.update_one(
+            {"_id": self.name}, {"$set": {"token": token}}, upsert=True
+        )
+
+    def _open(self, pipeline):
+        from internal.database_init import db
+
+        return db.watch(
+            pipeline,
+            full_document="updateLookup",
+            resume_after=self._token,
+            max_await_time_ms=1000,
+        )
+
+    async def _watch(self):
+        """Follow the stream until the watched collections change."""
+        self._reopen = False
+        pipeline = [{"$match": {"ns.coll": {"$in": list(self._handlers)}}}]
+        saved, saved_at = self._token, time.monotonic()
+        async with self._open(pipeline) as stream:
+            try:
+                while not self._reopen:
+                    change = await stream.try_next()
+                    if change is not None:
+                        await self._dispatch(change)
+                    # Also advances on idle polls, so the token stays on the oplog.
+                    self._token = stream.resume_token or self._token
+                    if (
+                        self._token != saved
+                        and time.monotonic() - saved_at >= self.save_interval
+                    ):
+                        await self._save(self._token)
+                        saved, saved_at = self._token, time.monotonic()
+            finally:
+                if self._reopen:
+                    self._token = self._reopen_from
+                if self._token != saved:
+                    asyncio.get_event_loop().create_task(self._save(self._token))
+
+    async def _run(self):
+        try:
+            self._token = await self._load()
+        except PyMongoError:
+            logger.exception("Could not load the change stream resume token.")
+            self._token = None
+        while True:
+            if not self._handlers:
+                await asyncio.sleep(self.retry_delay)
+                continue
+            try:
+                await self._watch()
+            except OperationFailure as e:
+                if e.code == NO_REPLICA_SET:
+                    logger.info(
+                        "Change streams need a replica set. "
+                        "Caches will only see this instance's writes."
+                    )
+                    return
+                if e.code in HISTORY_LOST:
+                    logger.warning("Change stream history lost, rebuilding caches.")
+                    self._token = None
+                    await self._resync()
+                    continue
+                logger.exception("Change stream failed, retrying.")
+                await asyncio.sleep(self.retry_delay)
+            except PyMongoError:
+                logger.exception("Change stream failed, retrying.")
+                await asyncio.sleep(self.retry_delay)
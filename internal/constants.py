@@ -49,6 +49,9 @@ TYPE_MAX_LENGTH = 20
 # limit for latest maps command
 NEWEST_MAPS_LIMIT = 10
 
+# amount of records kept on each materialized leaderboard
+LEADERBOARD_SIZE = 10
+
 # Map names | CUSTOMIZE ACCEPTABLE NAMES
 AYUTTHAYA = ["ayutthaya", "ayutt", "ayaya"]
 BLACKFOREST = ["blackforest", "bf", "black forest"]
@@ -1,3 +1,9 @@
+import datetime
+import re
+from logging import getLogger
+
+from pymongo import UpdateOne
+from pymongo.collation import Collation
 from umongo import Document
 from umongo.fields import (
     BooleanField,
@@ -6,12 +12,70 @@ from umongo.fields import (
     FloatField,
     IntegerField,
     ListField,
+    ObjectIdField,
     StringField,
     UrlField,
 )
 
+from internal.constants import LEADERBOARD_SIZE
 from internal.database_init import instance
 
+logger = getLogger(__name__)
+
+
+def normalize_name(name):
+    """Case-normalized player name used for indexed name lookups."""
+    return name.strip().casefold()
+
+
+def normalize_level(level):
+    """Case-normalized level name used for exact-match level lookups."""
+    return level.strip().casefold()
+
+
+_CREATOR_SEPARATORS = re.compile(r"\s*(?:[&,/+|]|\band\b)\s*|\s+")
+
+
+def creator_tokens(creator):
+    """Split a creator string like "A & B" into normalized individual name tokens."""
+    return [token for token in _CREATOR_SEPARATORS.split(creator.casefold()) if token]
+
+
+async def _backfill(collection, query, projection, update):
+    """Bulk $set derived fields for every document matching query."""
+    requests, count = [], 0
+    async for document in collection.find(query, projection):
+        requests.append(UpdateOne({"_id": document["_id"]}, {"$set": update(document)}))
+        if len(requests) == 500:
+            await collection.bulk_write(requests, ordered=False)
+            count += len(requests)
+            requests = []
+    if requests:
+        await collection.bulk_write(requests, ordered=False)
+        count += len(requests)
+    if count:
+        logger.info(f"Backfilled {count} {collection.name} documents.")
+
+
+_completed_backfills = set()
+
+
+async def backfill_done(name):
+    """Whether a one-off backfill has completed a full pass."""
+    if name not in _completed_backfills:
+        if await Backfills.collection.count_documents({"_id": name}, limit=1):
+            _completed_backfills.add(name)
+    return name in _completed_backfills
+
+
+async def mark_backfill_done(name):
+    """Record that a one-off backfill has completed a full pass."""
+    await Backfills.collection.update_one(
+        {"_id": name},
+        {"$set": {"completed": datetime.datetime.utcnow()}},
+        upsert=True,
+    )
+
 
 @instance.register
 class BonusData(Document):
@@ -26,6 +90,7 @@ class BonusData(Document):
         """MongoDb database collection name."""
 
         collection_name = "BonusData"
+        indexes = [{"key": ["record"], "name": "record"}]
 
 
 @instance.register
@@ -41,6 +106,7 @@ class HardcoreData(Document):
         """MongoDb database collection name."""
 
         collection_name = "HardcoreData"
+        indexes = [{"key": ["record"], "name": "record"}]
 
 
 @instance.register
@@ -49,6 +115,7 @@ class MapData(Document):
 
     code = StringField(required=True, unique=True)
     creator = StringField(required=True)
+    creator_tokens = ListField(StringField())
     map_name = StringField(required=True)
     posted_by = IntegerField(required=True)
     type = ListField(StringField(), required=True)
@@ -58,6 +125,26 @@ class MapData(Document):
         """MongoDb database collection name."""
 
         collection_name = "MapData"
+        indexes = [
+            {"key": ["map_name", "type"], "name": "map_name_type"},
+            {"key": ["type", "map_name"], "name": "type_map_name"},
+            {"key": ["creator_tokens"], "name": "creator_tokens"},
+        ]
+
+    def pre_insert(self):
+        self.creator_tokens = creator_tokens(self.creator)
+
+    def pre_update(self):
+        self.creator_tokens = creator_tokens(self.creator)
+
+    @classmethod
+    async def backfill(cls):
+        await _backfill(
+            cls.collection,
+            {"creator_tokens": {"$exists": False}},
+            {"creator": True},
+            lambda document: {"creator_tokens": creator_tokens(document["creator"])},
+        )
 
 
 @instance.register
@@ -68,6 +155,7 @@ class Guides(Document):
 
     class Meta:
         collection_name = "Guides"
+        indexes = [{"key": ["code"], "name": "code"}]
 
 
 @instance.register
@@ -83,6 +171,7 @@ class MildcoreData(Document):
         """MongoDb database collection name."""
 
         collection_name = "MildcoreData"
+        indexes = [{"key": ["record"], "name": "record"}]
 
 
 @instance.register
@@ -116,6 +205,7 @@ class TimeAttackData(Document):
         """MongoDb database collection name."""
 
         collection_name = "TimeAttackData"
+        indexes = [{"key": ["record"], "name": "record"}]
 
 
 @instance.register
@@ -142,14 +232,120 @@ class WorldRecords(Document):
     message_id = IntegerField(required=True)
     url = StringField(required=True)
     level = StringField(required=True)
+    level_key = StringField()
     record = FloatField(required=True)
     verified = BooleanField(require=True)
+    rejected = BooleanField()
     hidden_id = IntegerField(required=True)
 
     class Meta:
         """MongoDb database collection name."""
 
         collection_name = "WorldRecords"
+        indexes = [
+            {"key": ["code", "level_key", "record"], "name": "code_level_key_record"},
+            {
+                "key": ["code", "level_key", "verified", "record"],
+                "name": "code_level_key_verified_record",
+            },
+            {
+                "key": ["code", "level"],
+                "name": "code_level_natural",
+                "collation": Collation(locale="en_US", numericOrdering=True),
+            },
+            {"key": ["message_id"], "name": "message_id"},
+            {"key": ["posted_by", "code", "level"], "name": "posted_by_code_level"},
+            {"key": ["verified", "rejected", "_id"], "name": "pending_verification"},
+        ]
+
+    def pre_insert(self):
+        self.level_key = normalize_level(self.level)
+
+    def pre_update(self):
+        self.level_key = normalize_level(self.level)
+
+    @classmethod
+    async def backfill(cls):
+        await _backfill(
+            cls.collection,
+            {"level_key": {"$exists": False}},
+            {"level": True},
+            lambda document: {"level_key": normalize_level(document["level"])},
+        )
+
+    @classmethod
+    async def rank(cls, code, level_key, record, verified=False):
+        """Rank a record would hold on a level's board, from one indexed count.
+
+        Only strictly faster records are counted, so ties share a rank.
+        """
+        query = {"code": code, "level_key": level_key, "record": {"$lt": record}}
+        if verified:
+            query["verified"] = True
+        return await cls.count_documents(query) + 1
+
+    @classmethod
+    async def player_stats(cls, user_id):
+        """PB count, verified count, maps played and WRs held by one player.
+
+        WRs are the levels whose materialized verified leaderboard the player tops.
+        """
+        await Leaderboards.ensure({"posted_by": user_id})
+        same_level = {
+            "$and": [
+                {"$eq": ["$code", "$$code"]},
+                {"$eq": ["$level_key", "$$level_key"]},
+            ]
+        }
+        board_holder = {
+            "$lookup": {
+                "from": Leaderboards.collection.name,
+                "let": {"code": "$code", "level_key": "$level_key"},
+                "pipeline": [
+                    {"$match": {"$expr": same_level}},
+                    {
+                        "$project": {
+                            "holder": {"$arrayElemAt": ["$verified.posted_by", 0]}
+                        }
+                    },
+                ],
+                "as": "board",
+            }
+        }
+        facets = await cls.collection.aggregate(
+            [
+                {"$match": {"posted_by": user_id}},
+                {
+                    "$facet": {
+                        "totals": [
+                            {
+                                "$group": {
+                                    "_id": None,
+                                    "pbs": {"$sum": 1},
+                                    "verified": {
+                                        "$sum": {"$cond": ["$verified", 1, 0]}
+                                    },
+                                    "maps": {"$addToSet": "$code"},
+                                }
+                            }
+                        ],
+                        "world_records": [
+                            {"$match": {"verified": True}},
+                            board_holder,
+                            {"$match": {"board.holder": user_id}},
+                            {"$count": "count"},
+                        ],
+                    }
+                },
+            ]
+        ).to_list(length=1)
+        totals, world_records = facets[0]["totals"], facets[0]["world_records"]
+        return {
+            "pbs": totals[0]["pbs"] if totals else 0,
+            "verified": totals[0]["verified"] if totals else 0,
+            "maps": len(totals[0]["maps"]) if totals else 0,
+            "world_records": world_records[0]["count"] if world_records else 0,
+        }
 
 
 @instance.register
@@ -166,6 +362,7 @@ class Stars(Document):
         """MongoDb database collection name."""
 
         collection_name = "Starboard"
+        indexes = [{"key": ["message_id"], "name": "message_id"}]
 
     @classmethod
     async def search(cls, _id):
@@ -186,6 +383,7 @@ class SuggestionStars(Document):
         """MongoDb database collection name."""
 
         collection_name = "Suggestions"
+        indexes = [{"key": ["message_id"], "name": "message_id"}]
 
     @classmethod
     async def search(cls, _id):
@@ -205,3 +403,405 @@ class TopThree(Document):
         """MongoDb database collection name."""
 
         collection_name = "TopThree"
+
+
+@instance.register
+class BoardMessages(Document):
+    """Live tournament board messages database document."""
+
+    category = StringField(required=True, unique=True)
+    channel_id = IntegerField(required=True)
+    message_ids = ListField(IntegerField())
+
+    class Meta:
+        """MongoDb database collection name."""
+
+        collection_name = "BoardMessages"
+
+
+@instance.register
+class ChangeStreamTokens(Document):
+    """Change stream resume tokens database document."""
+
+    name = StringField(required=True, attribute="_id")
+    token = DictField(required=True)
+
+    class Meta:
+        """MongoDb database collection name."""
+
+        collection_name = "ChangeStreamTokens"
+
+
+@instance.register
+class Backfills(Document):
+    """Completed one-off backfills database document."""
+
+    name = StringField(required=True, attribute="_id")
+    completed = DateTimeField(required=True)
+
+    class Meta:
+        """MongoDb database collection name."""
+
+        collection_name = "Backfills"
+
+
+@instance.register
+class TournamentArchive(Document):
+    """Submissions of finished tournament rounds database document."""
+
+    round_id = ObjectIdField(required=True)
+    category = StringField(required=True)
+    posted_by = IntegerField(required=True)
+    name = StringField(required=True)
+    record = FloatField(required=True)
+    attachment_url = StringField(required=True)
+
+    class Meta:
+        """MongoDb database collection name."""
+
+        collection_name = "TournamentArchive"
+        indexes = [
+            {"key": ["posted_by", "-round_id"], "name": "posted_by_round_id"},
+            {
+                "key": ["category", "-round_id", "record"],
+                "name": "category_round_id_record",
+            },
+        ]
+
+    @classmethod
+    async def archive(cls, round_id, category, collection):
+        """Copy a category's submissions into the archive in one server-side pass.
+
+        Uses $merge, which needs MongoDB 4.2 or newer.
+        """
+        await collection.aggregate(
+            [
+                {"$addFields": {"round_id": round_id, "category": category}},
+                {
+                    "$merge": {
+                        "into": cls.collection.name,
+                        "whenMatched": "keepExisting",
+                        "whenNotMatched": "insert",
+                    }
+                },
+            ]
+        ).to_list(length=None)
+
+
+@instance.register
+class Players(Document):
+    """Players database document, keyed by Discord id."""
+
+    user_id = IntegerField(required=True, attribute="_id")
+    name = StringField(required=True)
+    past_names = ListField(StringField())
+    name_keys = ListField(StringField())
+
+    class Meta:
+        """MongoDb database collection name."""
+
+        collection_name = "Players"
+        indexes = [{"key": ["name_keys"], "name": "name_keys"}]
+
+    @classmethod
+    async def sync(cls, user_id, name, old_name=None):
+        """Upsert a player's current name, keeping old names searchable."""
+        add_to_set = {"name_keys": normalize_name(name)}
+        if old_name and old_name != name:
+            add_to_set["past_names"] = old_name
+        await cls.collection.update_one(
+            {"_id": user_id},
+            {"$set": {"name": name}, "$addToSet": add_to_set},
+            upsert=True,
+        )
+
+    @classmethod
+    async def resolve(cls, name, exact=True):
+        """Find (id, current name) of the players name most likely refers to.
+
+        Players currently using the name are preferred over those who used it
+        in the past. A player's Discord id also matches.
+        """
+        if name.isdecimal():
+            player = await cls.collection.find_one({"_id": int(name)}, {"name": True})
+            if player:
+                return [(player["_id"], player["name"])]
+        key = normalize_name(name)
+        query = {"name_keys": key if exact else re.compile(f"^{re.escape(key)}")}
+        players = [
+            (player["_id"], player["name"])
+            async for player in cls.collection.find(query, {"name": True})
+        ]
+        current = [
+            (user_id, player_name)
+            for user_id, player_name in players
+            if (
+                normalize_name(player_name) == key
+                if exact
+                else normalize_name(player_name).startswith(key)
+            )
+        ]
+        return current or players
+
+    @classmethod
+    async def backfill(cls):
+        # Players.sync may already have run for new posters, so the collection
+        # being non-empty says nothing. Every update below is idempotent, and
+        # the pass only counts as done once it has finished.
+        if await backfill_done(cls.collection.name):
+            return
+        requests = []
+        async for player in WorldRecords.collection.aggregate(
+            [
+                {"$sort": {"_id": 1}},
+                {
+                    "$group": {
+                        "_id": "$posted_by",
+                        "name": {"$last": "$name"},
+                        "names": {"$addToSet": "$name"},
+                    }
+                },
+            ]
+        ):
+            requests.append(
+                UpdateOne(
+                    {"_id": player["_id"]},
+                    {
+                        "$setOnInsert": {"name": player["name"]},
+                        "$addToSet": {
+                            "past_names": {
+                                "$each": [
+                                    n for n in player["names"] if n != player["name"]
+                                ]
+                            },
+                            "name_keys": {
+                                "$each": [normalize_name(n) for n in player["names"]]
+                            },
+                        },
+                    },
+                    upsert=True,
+                )
+            )
+        if requests:
+            await cls.collection.bulk_write(requests, ordered=False)
+            logger.info(f"Backfilled {len(requests)} {cls.collection.name} documents.")
+        await mark_backfill_done(cls.collection.name)
+
+
+@instance.register
+class Leaderboards(Document):
+    """Materialized top records of a single level, rebuilt on every record write."""
+
+    code = StringField(required=True)
+    level_key = StringField(required=True)
+    level = StringField(required=True)
+    records = ListField(DictField())
+    verified = ListField(DictField())
+
+    class Meta:
+        """MongoDb database collection name."""
+
+        collection_name = "Leaderboards"
+        indexes = [
+            {"key": ["code", "level_key"], "name": "code_level_key", "unique": True},
+            {
+                "key": ["code", "level"],
+                "name": "code_level_natural",
+                "collation": Collation(locale="en_US", numericOrdering=True),
+            },
+        ]
+
+    @classmethod
+    async def refresh(cls, code, level_key):
+        """Rebuild the leaderboard for one level from WorldRecords."""
+        entry = {
+            "_id": False,
+            "posted_by": True,
+            "name": True,
+            "level": True,
+            "record": True,
+            "verified": True,
+            "url": True,
+        }
+        facets = await WorldRecords.collection.aggregate(
+            [
+                {"$match": {"code": code, "level_key": level_key}},
+                {"$sort": {"record": 1}},
+                {
+                    "$facet": {
+                        "records": [
+                            {"$limit": LEADERBOARD_SIZE},
+                            {"$project": entry},
+                        ],
+                        "verified": [
+                            {"$match": {"verified": True}},
+                            {"$limit": LEADERBOARD_SIZE},
+                            {"$project": entry},
+                        ],
+                    }
+                },
+            ]
+        ).to_list(length=1)
+        records, verified = facets[0]["records"], facets[0]["verified"]
+
+        query = {"code": code, "level_key": level_key}
+        if not records:
+            await cls.collection.delete_one(query)
+            return None
+        board = dict(
+            query, level=records[0]["level"], records=records, verified=verified
+        )
+        await cls.collection.replace_one(query, board, upsert=True)
+        return cls.build_from_mongo(board)
+
+    @classmethod
+    async def get(cls, code, level_key):
+        """Find a level's leaderboard, building it if it was never materialized."""
+        board = await cls.find_one({"code": code, "level_key": level_key})
+        if board is None:
+            board = await cls.refresh(code, level_key)
+        return board
+
+    @classmethod
+    async def ensure(cls, query):
+        """Materialize the levels of WorldRecords matching query.
+
+        Only does anything until the backfill has finished, after which every
+        level is known to have its leaderboard.
+        """
+        if await backfill_done(cls.collection.name):
+            return
+        async for level in WorldRecords.collection.aggregate(
+            [
+                {"$match": query},
+                {"$group": {"_id": {"code": "$code", "level_key": "$level_key"}}},
+            ]
+        ):
+            await cls.refresh(level["_id"]["code"], level["_id"]["level_key"])
+
+    @classmethod
+    async def backfill(cls):
+        # Writes refresh single leaderboards, so the collection being non-empty
+        # says nothing. Refreshing is idempotent, and the pass only counts as
+        # done once it has finished.
+        if await backfill_done(cls.collection.name):
+            return
+        count = 0
+        async for level in WorldRecords.collection.aggregate(
+            [{"$group": {"_id": {"code": "$code", "level_key": "$level_key"}}}]
+        ):
+            await cls.refresh(level["_id"]["code"], level["_id"]["level_key"])
+            count += 1
+        if count:
+            logger.info(f"Backfilled {count} {cls.collection.name} documents.")
+        await mark_backfill_done(cls.collection.name)
+
+
+@instance.register
+class MapSummary(Document):
+    """Levels, record counts and map details of a single map code."""
+
+    code = StringField(required=True, attribute="_id")
+    levels = ListField(StringField())
+    record_count = IntegerField()
+    verified_count = IntegerField()
+    map_name = StringField()
+    creator = StringField()
+    type = ListField(StringField())
+    desc = StringField()
+
+    class Meta:
+        """MongoDb database collection name."""
+
+        collection_name = "MapSummary"
+
+    @classmethod
+    async def refresh_records(cls, code):
+        """Rebuild a code's naturally ordered level list and record counts."""
+        levels = await WorldRecords.collection.aggregate(
+            [
+                {"$match": {"code": code}},
+                {
+                    "$group": {
+                        "_id": {"$toUpper": "$level"},
+                        "records": {"$sum": 1},
+                        "verified": {"$sum": {"$cond": ["$verified", 1, 0]}},
+                    }
+                },
+                {"$sort": {"_id": 1}},
+            ],
+            collation=Collation(locale="en_US", numericOrdering=True),
+        ).to_list(length=None)
+        await cls.collection.update_one(
+            {"_id": code},
+            {
+                "$set": {
+                    "levels": [level["_id"] for level in levels],
+                    "record_count": sum(level["records"] for level in levels),
+                    "verified_count": sum(level["verified"] for level in levels),
+                }
+            },
+            upsert=True,
+        )
+
+    @classmethod
+    async def refresh_map(cls, code):
+        """Copy a code's map details from MapData, clearing them if it was removed."""
+        details = ("map_name", "creator", "type", "desc")
+        map_data = await MapData.collection.find_one(
+            {"code": code}, {field: True for field in details}
+        )
+        if map_data:
+            update = {"$set": {field: map_data.get(field) for field in details}}
+        else:
+            update = {"$unset": {field: "" for field in details}}
+        await cls.collection.update_one({"_id": code}, update, upsert=True)
+
+    @classmethod
+    async def get(cls, code):
+        """A code's summary, built on demand until the backfill has finished."""
+        if not await backfill_done(cls.collection.name):
+            await cls.refresh_records(code)
+            await cls.refresh_map(code)
+        return await cls.find_one({"code": code})
+
+    @classmethod
+    async def backfill(cls):
+        # Record and map writes refresh single summaries, so the collection
+        # being non-empty says nothing. Refreshing is idempotent, and the pass
+        # only counts as done once it has finished.
+        if await backfill_done(cls.collection.name):
+            return
+        record_codes = await WorldRecords.collection.distinct("code")
+        map_codes = await MapData.collection.distinct("code")
+        for code in record_codes:
+            await cls.refresh_records(code)
+        for code in map_codes:
+            await cls.refresh_map(code)
+        count = len(set(record_codes) | set(map_codes))
+        if count:
+            logger.info(f"Backfilled {count} {cls.collection.name} documents.")
+        await mark_backfill_done(cls.collection.name)
+
+
+DOCUMENTS = (
+    BonusData,
+    HardcoreData,
+    MapData,
+    Guides,
+    MildcoreData,
+    Schedule,
+    TimeAttackData,
+    TournamentData,
+    WorldRecords,
+    Stars,
+    SuggestionStars,
+    TopThree,
+    TournamentArchive,
+    BoardMessages,
+    ChangeStreamTokens,
+    Backfills,
+    Players,
+    Leaderboards,
+    MapSummary,
+)
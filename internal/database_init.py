@@ -1,15 +1,202 @@
+import threading
+import time
+from logging import getLogger
 from typing import Union
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+from pymongo.errors import OperationFailure
 from umongo import Instance
 
+from internal.change_streams import ChangeStreams
+
+logger = getLogger(__name__)
+
 instance: Union[Instance, None] = None
+db: Union[AsyncIOMotorDatabase, None] = None
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Record connection checkout wait times and in-use connection counts."""
+
+    def __init__(self, slow_checkout_ms=100):
+        self.slow_checkout_ms = slow_checkout_ms
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.in_use = 0
+        self.max_in_use = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "avg_wait_ms": (
+                    self.total_wait_ms / self.checkouts if self.checkouts else 0.0
+                ),
+                "max_wait_ms": self.max_wait_ms,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+            }
+
+    # Checkouts run on Motor's executor threads, so the start time is thread-local.
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        wait_ms = (time.perf_counter() - self._local.started) * 1000
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+        if wait_ms >= self.slow_checkout_ms:
+            logger.warning(
+                f"Waited {wait_ms:.0f}ms for a connection to {event.address} "
+                f"({self.in_use} in use)."
+            )
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+        logger.warning(f"Connection checkout to {event.address} failed: {event.reason}")
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use -= 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+
+pool_metrics = PoolMetrics()
+
+
+change_streams = ChangeStreams()
+
+
+def init(dburl, dbname, **client_options):
+    """Initialize a database instance.
+
+    client_options are passed through to the Motor client, e.g. maxPoolSize,
+    serverSelectionTimeoutMS, socketTimeoutMS or compressors.
+
+    The bot needs MongoDB 4.2 or newer, for $merge when archiving rounds, and
+    a replica set for change streams.
+    """
+    global instance, db
+
+    client = AsyncIOMotorClient(dburl, event_listeners=[pool_metrics], **client_options)
+
+    db = client[dbname]
+    instance = Instance(db)
+
+
+def _index_key(spec):
+    """Normalize an index key spec so live and declared indexes compare equal."""
+    return tuple((field, int(direction)) for field, direction in spec)
+
+
+def _index_changed(live, declared):
+    """Whether a live index differs from its declaration.
+
+    Compares the key pattern, uniqueness, partial filter and collation. The
+    server fills in collation defaults, so only declared collation options
+    are compared.
+    """
+    if _index_key(live["key"]) != _index_key(declared["key"].items()):
+        return True
+    if bool(live.get("unique")) != bool(declared.get("unique")):
+        return True
+    if live.get("partialFilterExpression") != declared.get("partialFilterExpression"):
+        return True
+    live_collation = live.get("collation") or {}
+    declared_collation = declared.get("collation") or {}
+    if bool(live_collation) != bool(declared_collation):
+        return True
+    return any(
+        live_collation.get(option) != value
+        for option, value in declared_collation.items()
+    )
+
+
+async def sync_indexes(*documents):
+    """Reconcile each Document's index manifest against the live database.
+
+    Missing indexes are created one by one, extra or changed ones are only
+    reported. An index that cannot be created is logged and skipped, and so
+    is a collection whose indexes cannot be read.
+    Defaults to every registered Document.
+    """
+    if not documents:
+        from internal.database import DOCUMENTS
+
+        documents = DOCUMENTS
+
+    for document in documents:
+        collection = document.collection
+        declared = {index.document["name"]: index for index in document.opts.indexes}
+        try:
+            live = await collection.index_information()
+        except OperationFailure:
+            logger.exception(f"Could not read {collection.name} indexes.")
+            continue
+        live.pop("_id_", None)
+
+        created = []
+        for name, index in declared.items():
+            if name in live:
+                continue
+            try:
+                await collection.create_indexes([index])
+            except OperationFailure:
+                logger.exception(f"Could not create {collection.name} index {name}.")
+            else:
+                created.append(name)
+        extra = [name for name in live if name not in declared]
+        changed = [
+            name
+            for name, index in declared.items()
+            if name in live and _index_changed(live[name], index.document)
+        ]
 
+        if created or extra or changed:
+            logger.info(
+                f"{collection.name} indexes :: "
+                f"created {created} | "
+                f"extra {extra} | "
+                f"changed {changed}"
+            )
 
-def init(dburl, dbname):
-    """Initialize a database instance."""
-    global instance
 
-    client = AsyncIOMotorClient(dburl)
+async def backfill():
+    """Fill derived fields on documents written before those fields existed."""
+    from internal.database import DOCUMENTS
 
-    instance = Instance(client[dbname])
+    for document in DOCUMENTS:
+        if not hasattr(document, "backfill"):
+            continue
+        try:
+            await document.backfill()
+        except Exception:
+            logger.exception(f"Backfill failed for {document.__name__}.")
@@ -19,6 +19,20 @@ consoleHandle.setFormatter(
 )
 logger.addHandler(consoleHandle)
 
+# Motor client option -> (env name, config name)
+MONGO_CLIENT_OPTIONS = {
+    "maxPoolSize": ("MONGO_MAX_POOL_SIZE", "mongoMaxPoolSize"),
+    "minPoolSize": ("MONGO_MIN_POOL_SIZE", "mongoMinPoolSize"),
+    "waitQueueTimeoutMS": ("MONGO_WAIT_QUEUE_TIMEOUT_MS", "mongoWaitQueueTimeoutMS"),
+    "serverSelectionTimeoutMS": (
+        "MONGO_SERVER_SELECTION_TIMEOUT_MS",
+        "mongoServerSelectionTimeoutMS",
+    ),
+    "connectTimeoutMS": ("MONGO_CONNECT_TIMEOUT_MS", "mongoConnectTimeoutMS"),
+    "socketTimeoutMS": ("MONGO_SOCKET_TIMEOUT_MS", "mongoSocketTimeoutMS"),
+    "compressors": ("MONGO_COMPRESSORS", "mongoCompressors"),
+}
+
 
 def load_config():
     load_dotenv(join("", ".env"))
@@ -37,6 +51,13 @@ async def run():
 
     config = load_config()
 
+    client_options = {}
+    for option, (env_name, config_name) in MONGO_CLIENT_OPTIONS.items():
+        value = get_config_var(env_name, config, config_name)
+        if value is None:
+            continue
+        client_options[option] = value if option == "compressors" else int(value)
+
     internal.database_init.init(
         get_config_var(
             "MONGO_CONNECTION_STRING", config, "mongoConnectionString", error=True
@@ -47,7 +68,10 @@ async def run():
             "mongoDbName",
             fallback="dpytemplate_default_db",
         ),
+        **client_options,
     )
+    await internal.database_init.sync_indexes()
+    asyncio.get_event_loop().create_task(internal.database_init.backfill())
 
     bot = Bot(
         config=config,
@@ -57,6 +81,9 @@ async def run():
     )
 
     bot.config = config
+    # Cogs load once the bot is ready; the cache handlers they register reopen
+    # the stream to include their collections.
+    internal.database_init.change_streams.start()
     token = get_config_var("BOT_TOKEN", config, "token", error=True)
     await bot.start(token)
 
@@ -0,0 +1,215 @@
+"""Change stream fan out tests against an in-memory stream.
+
+Runs without a server: the stream, token load and token save are replaced,
+so only ChangeStreams' own bookkeeping is exercised.
+"""
+
+import asyncio
+import time
+
+from pymongo.errors import OperationFailure
+
+from internal.change_streams import HISTORY_LOST, NO_REPLICA_SET, RESYNC, ChangeStreams
+
+
+class FakeServer:
+    """An oplog of change events that streams read from in order."""
+
+    def __init__(self):
+        self.log = []
+        self.saved = {}
+        self.opened = []
+        self.failures = []
+
+    def insert(self, collection_name, _id):
+        self.log.append(
+            {
+                "_id": {"_data": len(self.log)},
+                "operationType": "insert",
+                "ns": {"db": "test", "coll": collection_name},
+                "documentKey": {"_id": _id},
+            }
+        )
+
+
+class FakeStream:
+    """Follows the log after a resume token, like a filtered change stream."""
+
+    def __init__(self, server, collection_names, resume_after):
+        self.server = server
+        self.collection_names = collection_names
+        self.position = resume_after["_data"] + 1 if resume_after else len(server.log)
+        self.resume_token = resume_after
+
+    async def __aenter__(self):
+        if self.server.failures:
+            raise self.server.failures.pop(0)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def _next(self):
+        while self.position < len(self.server.log):
+            change = self.server.log[self.position]
+            self.position += 1
+            # Filtered events still advance the token.
+            self.resume_token = change["_id"]
+            if change["ns"]["coll"] in self.collection_names:
+                return change
+        return None
+
+    async def try_next(self):
+        change = self._next()
+        if change is None:
+            # Like max_await_time_ms, events written meanwhile are returned.
+            await asyncio.sleep(0.001)
+            change = self._next()
+        return change
+
+
+class FakeChangeStreams(ChangeStreams):
+    def __init__(self, server, **kwargs):
+        super().__init__(save_interval=0, retry_delay=0, **kwargs)
+        self.server = server
+
+    async def _load(self):
+        return self.server.saved.get(self.name)
+
+    async def _save(self, token):
+        self.server.saved[self.name] = token
+
+    def _open(self, pipeline):
+        collection_names = pipeline[0]["$match"]["ns.coll"]["$in"]
+        self.server.opened.append((collection_names, self._token))
+        return FakeStream(self.server, collection_names, self._token)
+
+
+async def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.001)
+
+
+def recorder(seen, label):
+    async def handler(change):
+        seen.append((label, change["operationType"], change.get("documentKey")))
+
+    return handler
+
+
+def test_dispatch_isolates_handler_failures():
+    async def run():
+        streams = FakeChangeStreams(FakeServer())
+        seen = []
+
+        async def broken(change):
+            raise RuntimeError
+
+        streams.register("a", broken)
+        streams.register("a", recorder(seen, "a"))
+        streams.register("b", recorder(seen, "b"))
+        await streams._dispatch(
+            {"operationType": "insert", "ns": {"coll": "a"}, "documentKey": 1}
+        )
+        assert seen == [("a", "insert", 1)]
+
+    asyncio.run(run())
+
+
+def test_register_replays_changes_polled_past():
+    async def run():
+        server = FakeServer()
+        server.insert("a", 0)
+        server.saved["caches"] = {"_data": 0}
+        streams = FakeChangeStreams(server)
+        seen = []
+        streams.register("a", recorder(seen, "a"))
+        streams.start()
+        try:
+            await wait_for(lambda: server.opened)
+            # The open stream polls past b's insert before it sees the
+            # registration, so the reopened stream has to go back for it.
+            streams.register("b", recorder(seen, "b"))
+            server.insert("b", 1)
+            server.insert("a", 2)
+            await wait_for(lambda: ("b", "insert", {"_id": 1}) in seen)
+        finally:
+            streams.stop()
+
+        assert ("a", "insert", {"_id": 2}) in seen
+        assert server.opened == [(["a"], {"_data": 0}), (["a", "b"], {"_data": 0})]
+
+    asyncio.run(run())
+
+
+def test_token_is_saved_and_resumed():
+    async def run():
+        server = FakeServer()
+        seen = []
+        first = FakeChangeStreams(server)
+        first.register("a", recorder(seen, "first"))
+        first.start()
+        try:
+            await wait_for(lambda: server.opened)
+            server.insert("a", 0)
+            await wait_for(lambda: server.saved.get("caches") == {"_data": 0})
+        finally:
+            first.stop()
+        await asyncio.sleep(0)
+
+        # Written while nothing is watching.
+        server.insert("a", 1)
+
+        second = FakeChangeStreams(server)
+        second.register("a", recorder(seen, "second"))
+        second.start()
+        try:
+            await wait_for(lambda: len(seen) == 2)
+        finally:
+            second.stop()
+
+        assert seen == [
+            ("first", "insert", {"_id": 0}),
+            ("second", "insert", {"_id": 1}),
+        ]
+
+    asyncio.run(run())
+
+
+def test_history_lost_resyncs_from_now():
+    async def run():
+        server = FakeServer()
+        server.insert("a", 0)
+        server.saved["caches"] = {"_data": 0}
+        server.failures.append(OperationFailure("history lost", code=HISTORY_LOST[1]))
+        streams = FakeChangeStreams(server)
+        seen = []
+        streams.register("a", recorder(seen, "a"))
+        streams.register("b", recorder(seen, "b"))
+        streams.start()
+        try:
+            await wait_for(lambda: len(server.opened) == 2)
+        finally:
+            streams.stop()
+
+        assert sorted(seen) == [("a", RESYNC, None), ("b", RESYNC, None)]
+        assert server.opened[1] == (["a", "b"], None)
+
+    asyncio.run(run())
+
+
+def test_no_replica_set_stops():
+    async def run():
+        server = FakeServer()
+        server.failures.append(
+            OperationFailure("not a replica set", code=NO_REPLICA_SET)
+        )
+        streams = FakeChangeStreams(server)
+        streams.register("a", recorder([], "a"))
+        streams.start()
+        await asyncio.wait_for(streams._task, 5)
+        assert len(server.opened) == 1
+
+    asyncio.run(run())
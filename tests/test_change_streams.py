@@ -0,0 +1,174 @@
+"""Change stream subscriber tests.
+
+These need a local single-node replica set, e.g.::
+
+    mongod --replSet rs0 --dbpath /tmp/rs0
+    mongo --eval "rs.initiate()"
+
+Set MONGO_TEST_URL to point elsewhere. The tests are skipped when no replica
+set is reachable.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+
+import pytest
+
+pytest.importorskip("motor")
+pytest.importorskip("umongo")
+
+from pymongo import MongoClient
+from pymongo.errors import OperationFailure, PyMongoError
+
+import internal.database_init as database_init
+from internal.change_streams import RESYNC
+
+MONGO_URL = os.environ.get(
+    "MONGO_TEST_URL", "mongodb://localhost:27017/?directConnection=true"
+)
+
+
+def _replica_set_reachable():
+    try:
+        with MongoClient(MONGO_URL, serverSelectionTimeoutMS=1000) as client:
+            return "setName" in client.admin.command("isMaster")
+    except PyMongoError:
+        return False
+
+
+pytestmark = pytest.mark.skipif(
+    not _replica_set_reachable(), reason="needs a local single-node replica set"
+)
+
+
+@pytest.fixture(scope="module")
+def loop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="module")
+def db(loop):
+    name = f"doombot_test_{uuid.uuid4().hex[:8]}"
+    database_init.init(MONGO_URL, name)
+    # Registers ChangeStreamTokens with the instance created above.
+    import internal.database  # noqa: F401
+
+    yield database_init.db
+    loop.run_until_complete(database_init.db.client.drop_database(name))
+
+
+async def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not await predicate():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.05)
+
+
+async def stored_token(db, name):
+    document = await db.ChangeStreamTokens.find_one({"_id": name})
+    return document["token"] if document else None
+
+
+def recorder(seen, label):
+    async def handler(change):
+        seen.append((label, change["operationType"], change.get("documentKey")))
+
+    return handler
+
+
+def test_register_reopens_stream(loop, db):
+    async def run():
+        streams = database_init.ChangeStreams(name="register", save_interval=0)
+        seen = []
+        streams.register("register_a", recorder(seen, "a"))
+        streams.start()
+        try:
+            # The token is saved once the stream has polled, so it is open.
+            await wait_for(lambda: stored_token(db, "register"))
+
+            streams.register("register_b", recorder(seen, "b"))
+            b = await db.register_b.insert_one({})
+            a = await db.register_a.insert_one({})
+
+            expected = [
+                ("b", "insert", {"_id": b.inserted_id}),
+                ("a", "insert", {"_id": a.inserted_id}),
+            ]
+
+            async def both_seen():
+                return all(change in seen for change in expected)
+
+            await wait_for(both_seen)
+        finally:
+            streams.stop()
+
+    loop.run_until_complete(run())
+
+
+def test_resume_token_is_persisted(loop, db):
+    async def run():
+        seen = []
+        first = database_init.ChangeStreams(name="resume", save_interval=0)
+        first.register("resume", recorder(seen, "first"))
+        first.start()
+        try:
+            await wait_for(lambda: stored_token(db, "resume"))
+        finally:
+            first.stop()
+        await asyncio.sleep(0.1)
+
+        # Written while nothing is watching.
+        missed = await db.resume.insert_one({})
+
+        second = database_init.ChangeStreams(name="resume", save_interval=0)
+        second.register("resume", recorder(seen, "second"))
+        second.start()
+        try:
+
+            async def missed_seen():
+                return ("second", "insert", {"_id": missed.inserted_id}) in seen
+
+            await wait_for(missed_seen)
+        finally:
+            second.stop()
+
+    loop.run_until_complete(run())
+
+
+def test_history_lost_resyncs(loop, db):
+    async def run():
+        streams = database_init.ChangeStreams(name="resync", save_interval=0)
+        seen = []
+        streams.register("resync", recorder(seen, "resync"))
+        attempts = []
+
+        async def watch():
+            attempts.append(streams._token)
+            if len(attempts) == 1:
+                raise OperationFailure("history lost", code=286)
+            await asyncio.Event().wait()
+
+        await db.ChangeStreamTokens.insert_one(
+            {"_id": "resync", "token": {"_data": "stale"}}
+        )
+        streams._watch = watch
+        streams.start()
+        try:
+
+            async def resynced():
+                return len(attempts) == 2
+
+            await wait_for(resynced)
+        finally:
+            streams.stop()
+
+        assert seen == [("resync", RESYNC, None)]
+        # The lost token is dropped, so the stream reopens from now.
+        assert attempts == [{"_data": "stale"}, None]
+
+    loop.run_until_complete(run())
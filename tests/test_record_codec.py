@@ -0,0 +1,81 @@
+"""Record time parsing and formatting tests."""
+
+import pytest
+
+from utils.record_codec import format_record, parse_record
+
+
+@pytest.mark.parametrize(
+    "seconds",
+    [0, 0.5, 5, 59.99, 60, 125.25, 3599.99, 3600, 3723.45, 86399.99],
+)
+def test_round_trip(seconds):
+    assert parse_record(format_record(seconds)) == pytest.approx(seconds)
+
+
+@pytest.mark.parametrize("seconds", [-0.5, -90.25, -3723.45])
+def test_negative_round_trip(seconds):
+    assert format_record(seconds).startswith("-")
+    assert parse_record(format_record(seconds)) == pytest.approx(seconds)
+
+
+@pytest.mark.parametrize(
+    "text, seconds",
+    [
+        ("1:02:03.45", 3723.45),
+        ("02:03.45", 123.45),
+        ("2:05", 125.0),
+        ("3.45", 3.45),
+        ("59", 59.0),
+        (" 1:30 ", 90.0),
+    ],
+)
+def test_parse_omitted_hours_and_minutes(text, seconds):
+    assert parse_record(text) == pytest.approx(seconds)
+
+
+@pytest.mark.parametrize(
+    "text, seconds",
+    [("-1:30", -90.0), ("-0:00:01.50", -1.5), ("-12.5", -12.5)],
+)
+def test_parse_negative(text, seconds):
+    assert parse_record(text) == pytest.approx(seconds)
+
+
+@pytest.mark.parametrize(
+    "seconds, text",
+    [
+        (5, "0:00:05.00"),
+        (-90.25, "-0:01:30.25"),
+        (3723.456, "1:02:03.45"),
+        (90061.5, "1 day, 1:01:01.50"),
+        (200000, "2 days, 7:33:20.00"),
+    ],
+)
+def test_format(seconds, text):
+    assert format_record(seconds) == text
+
+
+@pytest.mark.parametrize(
+    "seconds, text",
+    [
+        # Hundredths are truncated, not rounded.
+        (1.999, "0:00:01.99"),
+        (59.995, "0:00:59.99"),
+        (0.005, "0:00:00.00"),
+        # Float noise below a microsecond does not drop a hundredth.
+        (0.29, "0:00:00.29"),
+        (1.1 + 2.2, "0:00:03.30"),
+        (59.99999999, "0:01:00.00"),
+    ],
+)
+def test_format_rounding(seconds, text):
+    assert format_record(seconds) == text
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["", " ", "-", "abc", "1:a", "1e3", "1:2:3:4", "1::2", "1:2.5:3", "--1", "+5"],
+)
+def test_parse_invalid(text):
+    assert parse_record(text) is None
@@ -1,6 +1,11 @@
+from typing import Iterable, List, Optional
+
 import discord
 from discord import Embed
 
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
 
 def doom_embed(
     title: str, desc: str = "", url: str = "", color: hex = 0x000001
@@ -18,3 +23,37 @@ def hall_of_fame(title: str, desc: str = "") -> Embed:
     embed.set_author(name="Hall of Fame")
     embed.set_thumbnail(url="https://clipartart.com/images/dog-trophy-clipart-2.png")
     return embed
+
+
+def batch_embeds(embeds: Iterable[Embed]) -> List[List[Embed]]:
+    """Pack embeds into as few messages as Discord's per-message limits allow."""
+    batches, batch, size = [], [], 0
+    for embed in embeds:
+        length = len(embed)
+        if batch and (
+            len(batch) == MAX_EMBEDS_PER_MESSAGE
+            or size + length > MAX_EMBED_CHARS_PER_MESSAGE
+        ):
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(embed)
+        size += length
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+async def send_embeds(
+    channel: discord.abc.Messageable,
+    embeds: Iterable[Embed],
+    content: Optional[str] = None,
+):
+    """Send embeds as multi-embed messages, with content on the first one."""
+    batches = batch_embeds(embeds)
+    if not batches:
+        if content:
+            await channel.send(content)
+        return
+    for batch in batches:
+        await channel.send(content, embeds=batch)
+        content = None
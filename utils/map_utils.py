@@ -8,7 +8,7 @@ import pymongo
 import internal.constants as constants
 from internal.database import MapData
 from utils.embeds import doom_embed
-from utils.views import Paginator
+from utils.pages import EmbedPages, send_pages
 
 if len(sys.argv) > 1:
     if sys.argv[1] == "test":
@@ -36,7 +36,6 @@ async def searchmap(
     """
     # Checks for map_type, if exists
     await ctx.message.delete()
-    author = ctx.author
     if map_type:
         if map_type not in constants.TYPES_OF_MAP:
             await ctx.send(
@@ -45,51 +44,16 @@ async def searchmap(
             )
             return
 
-    # init vars
-    row, embeds = 0, []
-
-    embed = doom_embed(title=map_name or creator or map_code or map_type)
-    count = await MapData.count_documents(query)
-
-    async for entry in MapData.find(query).sort([("map_name", pymongo.ASCENDING)]):
-
-        # Every 10th embed field, create a embed obj and add to a list
-        if row != 0 and (row % 10 == 0 or count - 1 == row):
-
-            embed.add_field(
-                name=f"{entry.code} - {constants.PRETTY_NAMES[entry.map_name]}",
-                value=f"> Creator: {entry.creator}\n> Map Types: {', '.join(entry.type)}\n> Description: {entry.desc}",
-                inline=False,
-            )
-            embeds.append(embed)
-            embed = doom_embed(title=map_name or creator or map_code or map_type)
-
-        # Create embed fields for fields 1 thru 9
-        elif row % 10 != 0 or row == 0:
-            embed.add_field(
-                name=f"{entry.code} - {constants.PRETTY_NAMES[entry.map_name]}",
-                value=f"> Creator: {entry.creator}\n> Map Types: {', '.join(entry.type)}\n> Description: {entry.desc}",
-                inline=False,
-            )
-
-        # If only one page
-        if count == 1:
-            embeds.append(embed)
-        row += 1
-
-    # Displays paginated embeds
-    if row > 1:
-        view = Paginator(embeds, author)
-        paginator = await ctx.send(embed=view.formatted_pages[0], view=view)
-        await view.wait()
-        await paginator.delete()
-    elif row == 1:
-        await ctx.send(embed=embeds[0], delete_after=120)
-    else:
-        await ctx.send(
-            f"Nothing exists for {map_name or creator or map_code or map_type}!",
-            delete_after=10,
+    title = map_name or creator or map_code or map_type
+    pages = EmbedPages(lambda: doom_embed(title=title))
+    rows = (
+        (
+            f"{entry.code} - {constants.PRETTY_NAMES[entry.map_name]}",
+            f"> Creator: {entry.creator}\n> Map Types: {', '.join(entry.type)}\n> Description: {entry.desc}",
         )
+        async for entry in MapData.find(query).sort([("map_name", pymongo.ASCENDING)])
+    )
+    await send_pages(ctx, pages.stream(rows), f"Nothing exists for {title}!")
 
 
 def normal_map_query(map_name, map_type=""):
@@ -0,0 +1,81 @@
+import asyncio
+import time
+from logging import getLogger
+from typing import Dict, Iterable, Optional
+
+import discord
+
+logger = getLogger(__name__)
+
+
+class MemberResolver:
+    """Resolve user ids to names through the guild's id-keyed member cache.
+
+    Ids missing from the cache can be batch-fetched with :meth:`prefetch`.
+    Departed members fall back to the name stored with their record, and are
+    not fetched again for `unknown_ttl` seconds in case they rejoin.
+    """
+
+    def __init__(self, unknown_ttl=3600):
+        self.unknown_ttl = unknown_ttl
+        self.hits = 0
+        self.misses = 0
+        # User id -> when a fetch may be tried again.
+        self._unknown: Dict[int, float] = {}
+
+    def name(
+        self, guild: Optional[discord.Guild], user_id: int, fallback: str = "Unknown"
+    ) -> str:
+        member = guild.get_member(user_id) if guild else None
+        if member is None:
+            self.misses += 1
+            return fallback
+        self.hits += 1
+        return member.name
+
+    async def prefetch(self, guild: Optional[discord.Guild], user_ids: Iterable[int]):
+        """Fetch members missing from the cache, 100 ids per gateway request."""
+        if guild is None:
+            return
+        now = time.monotonic()
+        self._unknown = {
+            user_id: expires
+            for user_id, expires in self._unknown.items()
+            if expires > now
+        }
+        missing = [
+            user_id
+            for user_id in set(user_ids)
+            if user_id not in self._unknown and guild.get_member(user_id) is None
+        ]
+        for i in range(0, len(missing), 100):
+            chunk = missing[i : i + 100]
+            try:
+                members = await guild.query_members(user_ids=chunk, cache=True)
+            except (asyncio.TimeoutError, discord.ClientException):
+                logger.warning(f"Could not fetch {len(chunk)} members.")
+                continue
+            found = {member.id for member in members}
+            self._unknown.update(
+                (user_id, now + self.unknown_ttl)
+                for user_id in chunk
+                if user_id not in found
+            )
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "unknown": len(self._unknown)}
+
+
+resolver = MemberResolver()
+
+
+def ambiguous_players(name: str, players, limit: int = 10) -> str:
+    """Message listing the (id, name) players that name could refer to."""
+    listed = ", ".join(
+        f"{player_name} ({user_id})" for user_id, player_name in players[:limit]
+    )
+    more = f" and {len(players) - limit} more" if len(players) > limit else ""
+    return (
+        f"More than one player matches {name}: {listed}{more}. "
+        "Use the id of the one you mean."
+    )
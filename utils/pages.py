@@ -0,0 +1,142 @@
+from typing import AsyncIterable, Callable, Iterable, List, Optional, Sequence, Union
+
+from discord import Embed
+
+from utils.views import Paginator
+
+MAX_FIELDS = 25
+MAX_FIELD_NAME = 256
+MAX_FIELD_VALUE = 1024
+MAX_EMBED_CHARS = 6000
+# Room left for the page number footer added by Paginator.
+FOOTER_RESERVE = 64
+
+Value = Union[str, Sequence[str]]
+
+
+def _chunks(value: Value) -> List[str]:
+    """Join value segments into field values of at most MAX_FIELD_VALUE characters.
+
+    A segment is never split across fields unless it is too long on its own.
+    """
+    segments = [value] if isinstance(value, str) else value
+    chunks, chunk = [], ""
+    for segment in segments:
+        while len(segment) > MAX_FIELD_VALUE:
+            if chunk:
+                chunks.append(chunk)
+                chunk = ""
+            chunks.append(segment[:MAX_FIELD_VALUE])
+            segment = segment[MAX_FIELD_VALUE:]
+        if len(chunk) + len(segment) > MAX_FIELD_VALUE:
+            chunks.append(chunk)
+            chunk = ""
+        chunk += segment
+    if chunk or not chunks:
+        chunks.append(chunk or "\u200b")
+    return chunks
+
+
+class EmbedPages:
+    """Pack (name, value) rows into embed pages within Discord's embed limits.
+
+    A page is closed once it holds `rows_per_page` rows, or when the next row
+    would exceed the field count or total character limit. Values longer than
+    a field allows are split across numbered fields; a value may be given as a
+    sequence of segments so it is only split between them. A row with more
+    fields than fit on one page continues on the next.
+    """
+
+    def __init__(self, new_embed: Callable[[], Embed], rows_per_page: int = 10):
+        self.new_embed = new_embed
+        self.rows_per_page = rows_per_page
+        self._embed = None
+        self._rows = 0
+
+    def _fields(self, name: str, value: Value):
+        chunks = _chunks(value)
+        if len(chunks) == 1:
+            return [(name[:MAX_FIELD_NAME], chunks[0])]
+        return [
+            (f"{name[: MAX_FIELD_NAME - 8]} ({i})", chunk)
+            for i, chunk in enumerate(chunks, start=1)
+        ]
+
+    def _fits(self, fields: int, size: int) -> bool:
+        return (
+            len(self._embed.fields) + fields <= MAX_FIELDS
+            and len(self._embed) + size <= MAX_EMBED_CHARS - FOOTER_RESERVE
+        )
+
+    def add(self, name: str, value: Value, inline: bool = False) -> List[Embed]:
+        """Add a row. Returns the pages it closed, if any.
+
+        A row too big for any single page continues on the next one, its
+        numbered field names keeping the row's name.
+        """
+        fields = self._fields(name, value)
+        size = sum(len(n) + len(v) for n, v in fields)
+
+        finished = []
+        if self._embed is not None and (
+            self._rows >= self.rows_per_page or not self._fits(len(fields), size)
+        ):
+            finished.append(self.flush())
+
+        for field_name, field_value in fields:
+            if self._embed is None:
+                self._embed = self.new_embed()
+            elif not self._fits(1, len(field_name) + len(field_value)):
+                finished.append(self.flush())
+                self._embed = self.new_embed()
+            self._embed.add_field(name=field_name, value=field_value, inline=inline)
+        self._rows += 1
+        return finished
+
+    def flush(self) -> Optional[Embed]:
+        """Close and return the current page, if it has any rows."""
+        embed, self._embed, self._rows = self._embed, None, 0
+        return embed
+
+    def build(self, rows: Iterable) -> List[Embed]:
+        """Build every page from an iterable of (name, value) rows."""
+        pages = []
+        for name, value in rows:
+            pages.extend(self.add(name, value))
+        last = self.flush()
+        if last:
+            pages.append(last)
+        return pages
+
+    async def stream(self, rows: AsyncIterable):
+        """Yield pages from an async iterable of (name, value) rows as they fill."""
+        async for name, value in rows:
+            for page in self.add(name, value):
+                yield page
+        last = self.flush()
+        if last:
+            yield last
+
+
+async def send_pages(ctx, pages: AsyncIterable[Embed], empty_message: str):
+    """Send the first page as soon as it is built, then paginate once all are.
+
+    A single page is deleted after two minutes.
+    """
+    pages = pages.__aiter__()
+    try:
+        first = await pages.__anext__()
+    except StopAsyncIteration:
+        await ctx.send(empty_message, delete_after=10)
+        return
+
+    message = await ctx.send(embed=first)
+    rest = [page async for page in pages]
+    if not rest:
+        await message.delete(delay=120)
+        return
+
+    view = Paginator([first] + rest, ctx.author)
+    await message.edit(embed=view.formatted_pages[0], view=view)
+    await view.wait()
+    await message.delete()
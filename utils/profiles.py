@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from logging import getLogger
+
+from internal.database import WorldRecords
+
+logger = getLogger(__name__)
+
+
+class ProfileCache:
+    """Player statistics, computed once and kept until the player's records change.
+
+    Holds at most `max_size` players, evicting the least recently viewed.
+    """
+
+    def __init__(self, max_size=1000):
+        self.max_size = max_size
+        self._stats = OrderedDict()
+
+    async def get(self, user_id):
+        stats = self._stats.get(user_id)
+        if stats is not None:
+            self._stats.move_to_end(user_id)
+            return stats
+        stats = await WorldRecords.player_stats(user_id)
+        self._stats[user_id] = stats
+        if len(self._stats) > self.max_size:
+            self._stats.popitem(last=False)
+        return stats
+
+    def invalidate(self, *user_ids):
+        for user_id in user_ids:
+            self._stats.pop(user_id, None)
+
+    def clear(self):
+        self._stats.clear()
+
+    async def on_change(self, change):
+        """Apply a WorldRecords change stream event."""
+        document = change.get("fullDocument")
+        if document is None:
+            # Deletes and resyncs do not say whose records changed.
+            self.clear()
+        else:
+            self.invalidate(document["posted_by"])
+
+    async def on_leaderboard_change(self, change):
+        """Apply a Leaderboards change stream event.
+
+        A level's world record may have changed hands, which only concerns its
+        new holder and the cached players who hold any world record.
+        """
+        document = change.get("fullDocument")
+        if document is None and change["operationType"] != "delete":
+            self.clear()
+            return
+        self.invalidate(
+            *[
+                user_id
+                for user_id, stats in self._stats.items()
+                if stats["world_records"]
+            ]
+        )
+        if document and document.get("verified"):
+            self.invalidate(document["verified"][0]["posted_by"])
+
+
+profiles = ProfileCache()
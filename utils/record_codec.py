@@ -0,0 +1,90 @@
+"""Parse and format record times.
+
+Records are stored as seconds and displayed as ``H:MM:SS.ss``, with the
+hundredths truncated, a day prefix past 24 hours and a leading minus sign
+for negative times:
+
+>>> format_record(3723.456)
+'1:02:03.45'
+>>> format_record(5)
+'0:00:05.00'
+>>> format_record(0.005)
+'0:00:00.00'
+>>> format_record(90061.5)
+'1 day, 1:01:01.50'
+>>> format_record(200000)
+'2 days, 7:33:20.00'
+>>> format_record(-90.25)
+'-0:01:30.25'
+
+Input may omit hours and minutes. A leading minus sign negates the whole
+value, and anything else is rejected with None:
+
+>>> parse_record("1:02:03.45")
+3723.45
+>>> parse_record("2:05")
+125.0
+>>> parse_record("59.9")
+59.9
+>>> parse_record("-1:30")
+-90.0
+>>> parse_record("1:2:3:4") is None
+True
+>>> parse_record("1:a") is None
+True
+>>> parse_record("1e3") is None
+True
+>>> parse_record("") is None
+True
+"""
+
+from typing import Optional
+
+_RECORD_CHARS = "0123456789.:"
+_MINUTES_SECONDS = [f"{m:02d}:{s:02d}" for m in range(60) for s in range(60)]
+_HUNDREDTHS = [f"{c:02d}" for c in range(100)]
+
+
+def parse_record(text: str) -> Optional[float]:
+    """Convert H:MM:SS.ss (hours and minutes optional) into seconds."""
+    text = text.strip()
+    negative = text[:1] == "-"
+    if negative:
+        text = text[1:]
+    # Only digits, "." and ":" get this far, so int and float reject the rest.
+    if text.strip(_RECORD_CHARS):
+        return None
+    parts = text.split(":")
+    try:
+        if len(parts) == 1:
+            total = float(text)
+        elif len(parts) == 2:
+            total = int(parts[0]) * 60 + float(parts[1])
+        elif len(parts) == 3:
+            total = int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
+        else:
+            return None
+    except ValueError:
+        return None
+    return -total if negative else total
+
+
+def format_record(record: float) -> str:
+    """Convert seconds into H:MM:SS.ss."""
+    negative = record < 0
+    if negative:
+        record = -record
+    whole = int(record)
+    # Round to microseconds like timedelta does, then truncate to hundredths.
+    centis = whole * 100 + round((record - whole) * 1e6) // 10_000
+    hours, centis = divmod(centis, 360_000)
+    seconds, centis = divmod(centis, 100)
+    if hours < 24:
+        text = f"{hours}:{_MINUTES_SECONDS[seconds]}.{_HUNDREDTHS[centis]}"
+    else:
+        days, hours = divmod(hours, 24)
+        text = (
+            f"{days} day{'s' if days != 1 else ''}, "
+            f"{hours}:{_MINUTES_SECONDS[seconds]}.{_HUNDREDTHS[centis]}"
+        )
+    return "-" + text if negative else text
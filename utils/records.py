@@ -0,0 +1,23 @@
+from internal.database import Leaderboards, MapSummary
+from utils.profiles import profiles
+
+
+def _wr_holder(board):
+    return board.verified[0]["posted_by"] if board and board.verified else None
+
+
+async def records_changed(code, level_key, posted_by=None):
+    """Refresh data derived from a level's WorldRecords after any write to it.
+
+    posted_by is the player whose record was written, if known.
+    """
+    previous = await Leaderboards.find_one({"code": code, "level_key": level_key})
+    board = await Leaderboards.refresh(code, level_key)
+    await MapSummary.refresh_records(code)
+    # A new WR also changes the profile of the player who lost it.
+    profiles.invalidate(posted_by, _wr_holder(previous), _wr_holder(board))
+
+
+async def map_changed(code):
+    """Refresh data derived from a code's MapData after any write to it."""
+    await MapSummary.refresh_map(code)
@@ -0,0 +1,104 @@
+import asyncio
+import datetime
+import heapq
+import itertools
+from logging import getLogger
+
+from internal.database import Schedule
+
+logger = getLogger(__name__)
+
+# start_time is set to this once a scheduled round has started.
+STARTED = datetime.datetime(year=1, month=1, day=1)
+
+START = "start"
+END = "end"
+
+
+class TournamentScheduler:
+    """Run scheduled tournament starts and ends exactly when they are due.
+
+    Deadlines are kept in a heap loaded from Mongo. The loop sleeps until the
+    next deadline, and reloads when :meth:`notify` is called after a schedule
+    changes, or every ``resync_interval`` seconds as a safety net. If loading
+    or firing fails, it logs and starts over after ``retry_delay`` seconds.
+    """
+
+    def __init__(self, on_start, on_end, resync_interval=3600, retry_delay=30):
+        self.on_start = on_start
+        self.on_end = on_end
+        self.resync_interval = resync_interval
+        self.retry_delay = retry_delay
+        self._heap = []
+        self._counter = itertools.count()
+        self._changed = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_event_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    def notify(self):
+        """Reload deadlines after a schedule was added, changed or removed."""
+        self._changed.set()
+
+    async def _load(self):
+        heap = []
+        async for s in Schedule.find({}):
+            if s.start_time is not None and s.start_time != STARTED:
+                heap.append((s.start_time, next(self._counter), START, s.pk))
+            heap.append((s.schedule, next(self._counter), END, s.pk))
+        heapq.heapify(heap)
+        self._heap = heap
+
+    async def _fire(self, kind, pk):
+        # Re-read the schedule so a change that was never notified is respected.
+        s = await Schedule.find_one({"_id": pk})
+        if s is None:
+            return
+        now = datetime.datetime.now()
+        try:
+            if kind == START:
+                if s.start_time in (None, STARTED) or s.start_time > now:
+                    return
+                logger.info("Starting scheduled tournament.")
+                await self.on_start(s)
+            elif s.schedule <= now:
+                logger.info("Ending scheduled tournament.")
+                await self.on_end(s)
+        except Exception:
+            logger.exception(f"Scheduled tournament {kind} failed.")
+
+    async def _run(self):
+        while True:
+            try:
+                await self._follow()
+            except Exception:
+                logger.exception("Tournament scheduler failed, retrying.")
+                await asyncio.sleep(self.retry_delay)
+
+    async def _follow(self):
+        """Load deadlines and fire them until a reload is due."""
+        loop = asyncio.get_event_loop()
+        self._changed.clear()
+        await self._load()
+        resync_at = loop.time() + self.resync_interval
+
+        while not self._changed.is_set():
+            now = datetime.datetime.now()
+            while self._heap and self._heap[0][0] <= now:
+                _, _, kind, pk = heapq.heappop(self._heap)
+                await self._fire(kind, pk)
+
+            timeout = resync_at - loop.time()
+            if self._heap:
+                due_in = (self._heap[0][0] - datetime.datetime.now()).total_seconds()
+                timeout = min(timeout, due_in)
+            try:
+                await asyncio.wait_for(self._changed.wait(), max(timeout, 0))
+            except asyncio.TimeoutError:
+                if loop.time() >= resync_at:
+                    return
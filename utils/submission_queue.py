@@ -0,0 +1,128 @@
+import asyncio
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+
+class QueueMetrics:
+    """Depth, wait and processing times of one category's submission queue."""
+
+    def __init__(self, slow_wait_s=5):
+        self.slow_wait_s = slow_wait_s
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_processing = 0.0
+        self.stages = defaultdict(float)
+
+    def snapshot(self, depth):
+        handled = self.processed + self.failed
+        return {
+            "depth": depth,
+            "max_depth": self.max_depth,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_ms": self.total_wait / handled * 1000 if handled else 0.0,
+            "max_wait_ms": self.max_wait * 1000,
+            "avg_processing_ms": (
+                self.total_processing / handled * 1000 if handled else 0.0
+            ),
+            **{
+                f"avg_{stage}_ms": total / handled * 1000 if handled else 0.0
+                for stage, total in self.stages.items()
+            },
+        }
+
+
+class SubmissionQueue:
+    """Serve confirmed tournament submissions from bounded per-category queues.
+
+    Each category has its own queue and pool of workers, so a burst in one
+    category cannot starve the others. When a queue is full, put() refuses
+    the job and the caller can ask the player to retry.
+
+    A job is a coroutine function that takes a ``stage`` callable. Wrapping
+    work in ``async with stage("db")`` or ``async with stage("discord")``
+    records where processing time is spent.
+    """
+
+    def __init__(self, categories, workers=2, maxsize=50):
+        self.workers = workers
+        self.queues = {category: asyncio.Queue(maxsize) for category in categories}
+        self.metrics = {category: QueueMetrics() for category in categories}
+        self._tasks = []
+
+    def start(self):
+        loop = asyncio.get_event_loop()
+        self._tasks = [
+            loop.create_task(self._worker(category))
+            for category in self.queues
+            for _ in range(self.workers)
+        ]
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def full(self, category):
+        return self.queues[category].full()
+
+    def put(self, category, job):
+        """Queue a job. Returns False if the category's queue is full."""
+        queue = self.queues[category]
+        metrics = self.metrics[category]
+        try:
+            queue.put_nowait((time.perf_counter(), job))
+        except asyncio.QueueFull:
+            metrics.rejected += 1
+            logger.warning(f"{category} submission queue is full.")
+            return False
+        metrics.max_depth = max(metrics.max_depth, queue.qsize())
+        return True
+
+    def stats(self):
+        return {
+            category: self.metrics[category].snapshot(queue.qsize())
+            for category, queue in self.queues.items()
+        }
+
+    async def _worker(self, category):
+        queue = self.queues[category]
+        metrics = self.metrics[category]
+
+        @asynccontextmanager
+        async def stage(name):
+            started = time.perf_counter()
+            try:
+                yield
+            finally:
+                metrics.stages[name] += time.perf_counter() - started
+
+        while True:
+            queued_at, job = await queue.get()
+            started = time.perf_counter()
+            wait = started - queued_at
+            metrics.total_wait += wait
+            metrics.max_wait = max(metrics.max_wait, wait)
+            if wait >= metrics.slow_wait_s:
+                logger.warning(
+                    f"{category} submission waited {wait:.1f}s in queue "
+                    f"({queue.qsize()} waiting)."
+                )
+            try:
+                await job(stage)
+                metrics.processed += 1
+            except Exception:
+                metrics.failed += 1
+                logger.exception(f"{category} submission failed.")
+            finally:
+                metrics.total_processing += time.perf_counter() - started
+                queue.task_done()
@@ -1,16 +1,27 @@
+import asyncio
+import bisect
 import sys
+from collections import namedtuple
 from logging import getLogger
+from typing import Dict, List, Optional, Tuple
 
 import discord
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError, OperationFailure
 
 from internal.database import (
+    BoardMessages,
     BonusData,
     HardcoreData,
     MildcoreData,
     TimeAttackData,
     TopThree,
+    TournamentArchive,
 )
-from utils.embeds import doom_embed
+from internal.database_init import sync_indexes
+from utils.embeds import batch_embeds, doom_embed, send_embeds
+from utils.members import resolver
+from utils.pages import EmbedPages
 from utils.pb_utils import display_record
 from utils.views import Confirm, Paginator
 
@@ -22,6 +33,9 @@ else:
 
 logger = getLogger(__name__)
 
+# Error code for renaming a collection that does not exist.
+NAMESPACE_NOT_FOUND = 26
+
 
 def category_sort(message):
     if message.channel.id == constants_bot.TA_CHANNEL_ID:
@@ -37,116 +51,416 @@ def category_sort(message):
     return which_category
 
 
-async def tournament_boards(category, ctx=None, guild=None):
-    """Display boards for scoreboard and leaderboard commands."""
-    if ctx:
-        try:
-            await ctx.message.delete()
-        except discord.HTTPException:
-            pass
-    count = 0
-    embed = doom_embed(title=f"{category}")
-    embeds = []
-
-    if category == "TIMEATTACK":
-        _data_category = TimeAttackData
-    elif category == "MILDCORE":
-        _data_category = MildcoreData
-    elif category == "HARDCORE":
-        _data_category = HardcoreData
-    else:  # "BONUS"
-        _data_category = BonusData
+CATEGORY_DATA = {
+    "TIMEATTACK": TimeAttackData,
+    "MILDCORE": MildcoreData,
+    "HARDCORE": HardcoreData,
+    "BONUS": BonusData,
+}
+
+CATEGORY_TITLES = {
+    "TIMEATTACK": "TIME ATTACK",
+    "MILDCORE": "MILDCORE",
+    "HARDCORE": "HARDCORE",
+    "BONUS": "BONUS",
+}
+
+
+async def category_entries(category, guild):
+    """Read a category's submissions, fastest first, and prefetch their members."""
+    entries = [
+        entry async for entry in CATEGORY_DATA[category].find().sort("record", 1)
+    ]
+    await resolver.prefetch(guild, [entry.posted_by for entry in entries])
+    return entries
+
+
+def board_embeds(category, entries, guild):
+    """Render leaderboard pages of 10 rows each."""
+    pages = EmbedPages(lambda: doom_embed(title=category))
+    return pages.build(
+        (
+            f"#{count} - {resolver.name(guild, entry.posted_by, entry.name)}",
+            f"> Record: {display_record(entry.record)}\n",
+        )
+        for count, entry in enumerate(entries, start=1)
+    )
 
-    data_amount = await _data_category.count_documents()
 
-    async for entry in _data_category.find().sort("record", 1):
-        if ctx:
-            name = discord.utils.find(
-                lambda m: m.id == entry.posted_by, ctx.guild.members
+def screenshot_embeds(category, entries, guild):
+    """Render one screenshot embed per submission."""
+    embeds = []
+    for entry in entries:
+        embed = doom_embed(
+            title=resolver.name(guild, entry.posted_by, entry.name),
+            url=entry.attachment_url,
+        )
+        embed.add_field(name=category, value=f"{display_record(entry.record)}")
+        embed.set_image(url=entry.attachment_url)
+        embeds.append(embed)
+    return embeds
+
+
+BoardEntry = namedtuple("BoardEntry", ["posted_by", "name", "record"])
+
+
+class LiveBoard:
+    """In-memory standings of one category, kept sorted fastest first."""
+
+    def __init__(self):
+        self._entries: Dict[int, BoardEntry] = {}
+        self._order: List[Tuple[float, int]] = []
+
+    @property
+    def entries(self) -> List[BoardEntry]:
+        return [self._entries[posted_by] for _, posted_by in self._order]
+
+    def get(self, posted_by) -> Optional[BoardEntry]:
+        return self._entries.get(posted_by)
+
+    def rank(self, record) -> int:
+        """Rank of a record, counting only strictly faster entries."""
+        return bisect.bisect_left(self._order, (record,)) + 1
+
+    def upsert(self, posted_by, name, record):
+        self.remove(posted_by)
+        self._entries[posted_by] = BoardEntry(posted_by, name, record)
+        bisect.insort(self._order, (record, posted_by))
+
+    def remove(self, posted_by):
+        entry = self._entries.pop(posted_by, None)
+        if entry is not None:
+            self._order.remove((entry.record, posted_by))
+
+    def clear(self):
+        self._entries.clear()
+        self._order.clear()
+
+
+class LiveBoards:
+    """Tournament standings served from memory and mirrored to board messages.
+
+    Submissions and deletions patch the cached standings, and the board
+    messages are edited once per burst of changes, after `debounce` seconds.
+    Until the first load succeeds, `ready` is False and lookups go to the
+    database instead.
+    """
+
+    def __init__(self, debounce=5, retry_delay=30):
+        self.debounce = debounce
+        self.retry_delay = retry_delay
+        self.ready = False
+        self.channel: Optional[discord.TextChannel] = None
+        self.boards = {category: LiveBoard() for category in CATEGORY_DATA}
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._locks = {category: asyncio.Lock() for category in CATEGORY_DATA}
+
+    def __getitem__(self, category) -> LiveBoard:
+        return self.boards[category]
+
+    async def start(self, channel: Optional[discord.TextChannel]):
+        """Load every category from the database and refresh its board message.
+
+        Failed loads are logged and retried every `retry_delay` seconds.
+        """
+        if channel is None:
+            logger.error("Tournament channel not found, live boards are disabled.")
+            return
+        while True:
+            try:
+                entries = await asyncio.gather(
+                    *(
+                        category_entries(category, channel.guild)
+                        for category in self.boards
+                    )
+                )
+                break
+            except Exception:
+                logger.exception("Could not load the live boards, retrying.")
+                await asyncio.sleep(self.retry_delay)
+        self.channel = channel
+        self.ready = True
+        for category, rows in zip(self.boards, entries):
+            self._load(category, rows)
+
+    async def entries(self, category, guild):
+        """A category's standings, fastest first."""
+        if self.ready:
+            return self.boards[category].entries
+        return await category_entries(category, guild)
+
+    async def get(self, category, posted_by):
+        """A user's current entry in a category, if any."""
+        if self.ready:
+            return self.boards[category].get(posted_by)
+        return await CATEGORY_DATA[category].find_one({"posted_by": posted_by})
+
+    async def rank(self, category, record):
+        """Rank of a record, counting only strictly faster entries."""
+        if self.ready:
+            return self.boards[category].rank(record)
+        faster = await CATEGORY_DATA[category].count_documents(
+            {"record": {"$lt": record}}
+        )
+        return faster + 1
+
+    def _load(self, category, rows):
+        board = self.boards[category]
+        board.clear()
+        for entry in rows:
+            board.upsert(entry.posted_by, entry.name, entry.record)
+        self.touch(category)
+
+    async def reload(self, category):
+        """Reload one category from the database."""
+        if self.channel is None:
+            return
+        self._load(category, await category_entries(category, self.channel.guild))
+
+    async def on_change(self, category, change):
+        """Apply a change stream event on a category's collection."""
+        document = change.get("fullDocument")
+        if change["operationType"] == "drop":
+            self.reset([category])
+        elif document is not None:
+            self.submit(
+                category, document["posted_by"], document["name"], document["record"]
             )
+        else:
+            # Deletes only carry the _id, so the board is read again.
+            await self.reload(category)
+
+    def submit(self, category, posted_by, name, record):
+        self.boards[category].upsert(posted_by, name, record)
+        self.touch(category)
+
+    def remove(self, category, posted_by):
+        self.boards[category].remove(posted_by)
+        self.touch(category)
+
+    def reset(self, categories):
+        for category in categories:
+            self.boards[category].clear()
+            self.touch(category)
+
+    def touch(self, category):
+        """Schedule a board message edit, unless one is already pending."""
+        if self.channel is None or category in self._pending:
+            return
+        self._pending[category] = asyncio.get_event_loop().create_task(
+            self._debounced_publish(category)
+        )
 
-        if guild:
-            name = discord.utils.find(lambda m: m.id == entry.posted_by, guild.members)
-
-        embed.add_field(
-            name=f"#{count + 1} - {name}",
-            value=f"> Record: {display_record(entry.record)}\n",
-            inline=False,
+    async def _debounced_publish(self, category):
+        await asyncio.sleep(self.debounce)
+        # Changes made while publishing schedule another edit.
+        del self._pending[category]
+        try:
+            async with self._locks[category]:
+                await self._publish(category)
+        except discord.HTTPException:
+            logger.exception(f"Could not update the {category.lower()} board.")
+
+    async def _publish(self, category):
+        guild = self.channel.guild
+        embeds = board_embeds(category, self.boards[category].entries, guild) or [
+            doom_embed(
+                title=category,
+                desc=f"No times exist for the {category.lower()} tournament!",
+            )
+        ]
+        batches = batch_embeds(embeds)
+
+        stored = await BoardMessages.find_one({"category": category})
+        message_ids = (
+            stored.message_ids
+            if stored and stored.channel_id == self.channel.id
+            else []
         )
-        if (count + 1) % 10 == 0 or (count + 1) == data_amount:
-            embeds.append(embed)
-            embed = doom_embed(title=category)
-
-        count += 1
-    if guild:
-        channel = guild.get_channel(constants_bot.EXPORT_SS_CHANNEL_ID)
-    if embeds:
-        if ctx:
-            if len(embeds) > 1:
-                view = Paginator(embeds, ctx.author)
-                paginator = await ctx.send(embed=view.formatted_pages[0], view=view)
-                await view.wait()
-                await paginator.delete()
-            else:
-                await ctx.send(embed=embeds[0], delete_after=120)
-        if guild:
-            for e in embeds:
-                await channel.send(embed=e)
 
-    else:
-        if guild:
-            await channel.send(f"No times exist for the {category.lower()} tournament!")
-        else:
-            await ctx.send(
-                f"No times exist for the {category.lower()} tournament!",
-                delete_after=15,
+        published = []
+        for i, batch in enumerate(batches):
+            message = None
+            if i < len(message_ids):
+                message = self.channel.get_partial_message(message_ids[i])
+                try:
+                    await message.edit(embeds=batch)
+                except discord.NotFound:
+                    message = None
+            if message is None:
+                message = await self.channel.send(embeds=batch)
+            published.append(message.id)
+
+        for message_id in message_ids[len(batches) :]:
+            try:
+                await self.channel.get_partial_message(message_id).delete()
+            except discord.NotFound:
+                pass
+
+        if published != message_ids:
+            await BoardMessages.collection.update_one(
+                {"category": category},
+                {"$set": {"channel_id": self.channel.id, "message_ids": published}},
+                upsert=True,
             )
 
 
-async def exporter(category, channel, ctx=None, guild=None):
-    top_three: TopThree = await TopThree.find_one({})
+live_boards = LiveBoards()
+
+
+async def submit_record(category, posted_by, name, record, attachment_url):
+    """Store a submission only if it beats the player's stored time.
+
+    The conditional upsert falls through to an insert when the stored time is
+    as fast or faster, which the unique posted_by index rejects, so two
+    concurrent submissions can never both win.
+    Returns False if the submission was not faster.
+    """
+    try:
+        await CATEGORY_DATA[category].collection.update_one(
+            {"posted_by": posted_by, "record": {"$gt": record}},
+            {
+                "$set": {
+                    "name": name,
+                    "record": record,
+                    "attachment_url": attachment_url,
+                }
+            },
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+PODIUM_FIELDS = {
+    "TIMEATTACK": "ta_podium",
+    "MILDCORE": "mc_podium",
+    "HARDCORE": "hc_podium",
+    "BONUS": "bonus_podium",
+}
+
+
+async def podium(category):
+    """Ids of the three fastest players in a category."""
+    top = await (
+        CATEGORY_DATA[category]
+        .collection.aggregate(
+            [
+                {"$sort": {"record": 1}},
+                {"$limit": 3},
+                {"$project": {"_id": 0, "posted_by": 1}},
+            ]
+        )
+        .to_list(length=3)
+    )
+    return [entry["posted_by"] for entry in top]
 
-    if category == "TIMEATTACK":
-        _data_category = TimeAttackData
-    elif category == "MILDCORE":
-        _data_category = MildcoreData
-    elif category == "HARDCORE":
-        _data_category = HardcoreData
-    else:  # "BONUS"
-        _data_category = BonusData
 
-    count = 0
-    async for entry in _data_category.find().sort("record", 1):
+async def update_podiums(categories):
+    """Replace the hall of fame podiums in a single write.
 
-        if count < 3:
-            if category == "TIMEATTACK":
-                top_three.ta_podium = top_three.ta_podium + [entry.posted_by]
-            elif category == "MILDCORE":
-                top_three.mc_podium = top_three.mc_podium + [entry.posted_by]
-            elif category == "HARDCORE":
-                top_three.hc_podium = top_three.hc_podium + [entry.posted_by]
-            else:  # "BONUS"
-                top_three.bonus_podium = top_three.bonus_podium + [entry.posted_by]
+    Categories that were not part of the round are reset. The leading 0 keeps
+    the podium ordinals aligned with their positions.
+    """
+    podiums = await asyncio.gather(*(podium(category) for category in categories))
+    update = {field: [0] for field in PODIUM_FIELDS.values()}
+    for category, ids in zip(categories, podiums):
+        update[PODIUM_FIELDS[category]] = [0] + ids
+    await TopThree.collection.update_one({}, {"$set": update}, upsert=True)
 
-            await top_three.commit()
 
-        if ctx:
-            username = discord.utils.find(
-                lambda m: m.id == entry.posted_by, ctx.guild.members
-            )
-        if guild:
-            username = discord.utils.find(
-                lambda m: m.id == entry.posted_by, guild.members
-            )
+async def archive_round(categories, round_id=None):
+    """Move finished categories into the round archive and clear them.
 
-        embed = doom_embed(
-            title=username.name if username else "Unknown",
-            url=entry.attachment_url,
+    Each collection is first renamed out of the way. The rename is atomic, so
+    a submission written meanwhile lands either in the archived round or in
+    the new, empty collection, never in between. The new collection's indexes
+    are recreated before the renamed one is archived and dropped.
+    """
+    round_id = round_id or ObjectId()
+
+    async def archive(category):
+        document = CATEGORY_DATA[category]
+        staging = document.collection.database[
+            f"{document.collection.name}_archiving_{round_id}"
+        ]
+        try:
+            await document.collection.rename(staging.name)
+        except OperationFailure as e:
+            if e.code != NAMESPACE_NOT_FOUND:
+                raise
+            # No submissions this round.
+            staging = None
+        await sync_indexes(document)
+        if staging is not None:
+            await TournamentArchive.archive(round_id, category, staging)
+            await staging.drop()
+
+    await asyncio.gather(*(archive(category) for category in categories))
+    live_boards.reset(categories)
+
+
+async def export_round(categories, guild, channel):
+    """Export the boards and screenshots of each category at the end of a round.
+
+    Categories are read and rendered concurrently, while the output stage
+    sends them in the given order as soon as each one is ready.
+    """
+
+    async def render(category):
+        entries = await category_entries(category, guild)
+        header = f"***{10 * '-'}{CATEGORY_TITLES[category]}{10 * '-'}***"
+        if entries:
+            messages = [(header, board_embeds(category, entries, guild))]
+        else:
+            messages = [
+                (header, []),
+                (f"No times exist for the {category.lower()} tournament!", []),
+            ]
+        messages.append((None, screenshot_embeds(category, entries, guild)))
+        return messages
+
+    stages = [asyncio.create_task(render(category)) for category in categories]
+    try:
+        for stage in stages:
+            messages = await stage
+            for content, embeds in messages:
+                await send_embeds(channel, embeds, content)
+    finally:
+        for stage in stages:
+            stage.cancel()
+
+
+async def tournament_boards(category, ctx):
+    """Display boards for scoreboard and leaderboard commands."""
+    try:
+        await ctx.message.delete()
+    except discord.HTTPException:
+        pass
+
+    entries = await live_boards.entries(category, ctx.guild)
+    embeds = board_embeds(category, entries, ctx.guild)
+
+    if not embeds:
+        await ctx.send(
+            f"No times exist for the {category.lower()} tournament!",
+            delete_after=15,
         )
-        embed.add_field(name=category, value=f"{display_record(entry.record)}")
-        embed.set_image(url=entry.attachment_url)
-        await channel.send(embed=embed)
-        count += 1
+    elif len(embeds) > 1:
+        view = Paginator(embeds, ctx.author)
+        paginator = await ctx.send(embed=view.formatted_pages[0], view=view)
+        await view.wait()
+        await paginator.delete()
+    else:
+        await ctx.send(embed=embeds[0], delete_after=120)
+
+
+async def exporter(category, channel, ctx=None, guild=None):
+    if ctx:
+        guild = ctx.guild
+    entries = await category_entries(category, guild)
+    await send_embeds(channel, screenshot_embeds(category, entries, guild))
 
 
 async def single_exporter(ctx, category, user: discord.Member = None):
@@ -160,12 +474,8 @@ async def single_exporter(ctx, category, user: discord.Member = None):
         _data_category = BonusData
 
     async for entry in _data_category.find({"posted_by": user.id}).sort("record", 1):
-        username = discord.utils.find(
-            lambda m: m.id == entry.posted_by, ctx.guild.members
-        )
-
         embed = doom_embed(
-            title=username.name if username else "Unknown",
+            title=resolver.name(ctx.guild, entry.posted_by, entry.name),
             url=entry.attachment_url,
         )
         embed.add_field(name=category, value=f"{display_record(entry.record)}")
@@ -176,14 +486,12 @@ async def single_exporter(ctx, category, user: discord.Member = None):
 async def confirm_collection_drop(ctx, category):
     author = ctx.message.author
     await ctx.message.delete()
-    if category == "time attack":
-        _collection = TimeAttackData
-    elif category == "mildcore":
-        _collection = MildcoreData
-    elif category == "hardcore":
-        _collection = HardcoreData
-    elif category == "bonus":
-        _collection = BonusData
+    categories = {
+        "time attack": "TIMEATTACK",
+        "mildcore": "MILDCORE",
+        "hardcore": "HARDCORE",
+        "bonus": "BONUS",
+    }
 
     view = Confirm("Deletion", author)
     confirmation_msg = await ctx.send(
@@ -192,34 +500,35 @@ async def confirm_collection_drop(ctx, category):
     )
     await view.wait()
     if view.value:
+        round_id = ObjectId()
         if category == "all":
             msg_ta = await ctx.send("Clearing all time attack times... Please wait.")
-            await TimeAttackData.collection.drop()
+            await archive_round(["TIMEATTACK"], round_id)
             await msg_ta.edit(
                 content="All times in time attack have been cleared.", delete_after=10
             )
 
             msg_mc = await ctx.send("Clearing all mildcore times... Please wait.")
-            await MildcoreData.collection.drop()
+            await archive_round(["MILDCORE"], round_id)
             await msg_mc.edit(
                 content="All times in mildcore have been cleared.", delete_after=10
             )
 
             msg_hc = await ctx.send("Clearing all hardcore times... Please wait.")
-            await HardcoreData.collection.drop()
+            await archive_round(["HARDCORE"], round_id)
             await msg_hc.edit(
                 content="All times in hardcore have been cleared.", delete_after=10
             )
 
             msg_bonus = await ctx.send("Clearing all bonus times... Please wait.")
-            await BonusData.collection.drop()
+            await archive_round(["BONUS"], round_id)
             await msg_bonus.edit(
                 content="All times in bonus have been cleared.", delete_after=10
             )
 
         else:
             msg = await ctx.send(f"Clearing {category} times... Please wait.")
-            await _collection.collection.drop()
+            await archive_round([categories[category]], round_id)
             await msg.edit(
                 content=f"All times {'in' if category != 'all' else ''} {category if category != 'all' else ''} have been cleared.",
                 delete_after=10,
@@ -234,11 +543,50 @@ async def confirm_collection_drop(ctx, category):
         )
 
 
-async def lock_unlock(channel, role, unlock=True):
-    overwrite = channel.overwrites_for(role)
-    overwrite.send_messages = unlock
-    overwrite.attach_files = unlock
-    await channel.set_permissions(role, overwrite=overwrite)
+async def apply_permissions(changes, concurrency=4):
+    """Lock or unlock submissions with a single overwrite edit per channel.
+
+    Each channel's overwrites are fetched fresh, so a manual edit made since
+    the cache was filled is kept, and the role changes are merged into them.
+    If some overwrite targets are not cached, discord.py leaves them out of
+    channel.overwrites and a full replace would delete them, so that channel
+    falls back to one set_permissions per role.
+
+    Args:
+        changes: Iterable of (channel, role, unlock) tuples.
+        concurrency (int, optional): Channels edited at the same time.
+
+    """
+    unlocks = {}
+    for channel, role, unlock in changes:
+        if role is not None:
+            # Repeated pairs collapse to the last change.
+            unlocks.setdefault(channel, {})[role] = unlock
+
+    def merge(overwrite, unlock):
+        overwrite.send_messages = unlock
+        overwrite.attach_files = unlock
+        return overwrite
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def edit(channel, roles):
+        async with semaphore:
+            fresh = await channel.guild.fetch_channel(channel.id)
+            overwrites = fresh.overwrites
+            if len(overwrites) < len(fresh._overwrites):
+                for role, unlock in roles.items():
+                    await fresh.set_permissions(
+                        role, overwrite=merge(fresh.overwrites_for(role), unlock)
+                    )
+                return
+            for role, unlock in roles.items():
+                overwrites[role] = merge(
+                    overwrites.get(role, discord.PermissionOverwrite()), unlock
+                )
+            await fresh.edit(overwrites=overwrites)
+
+    await asyncio.gather(*(edit(c, roles) for c, roles in unlocks.items()))
 
 
 def mentions_to_list(mentions):
@@ -5,7 +5,8 @@ from typing import List
 
 import discord
 
-from internal.database import WorldRecords
+from internal.database import WorldRecords, normalize_level
+from utils.records import records_changed
 
 if len(sys.argv) > 1:
     if sys.argv[1] == "test":
@@ -139,10 +140,15 @@ class Paginator(discord.ui.View):
 
 
 class Verification(discord.ui.View):
-    def __init__(self, message: discord.Message, bot):
+    """Persistent verify/reject buttons shared by every pending submission.
+
+    The submission is looked up by the id of the message the buttons are on,
+    so a single instance registered with bot.add_view serves all of them,
+    including those sent before a restart.
+    """
+
+    def __init__(self, bot):
         super().__init__(timeout=None)
-        self.verify = None
-        self.message = message
         self.bot = bot
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
@@ -155,38 +161,124 @@ class Verification(discord.ui.View):
             return False
         return True
 
-    @discord.ui.button(label="Verify", style=discord.ButtonStyle.green)
-    async def verify(self, button: discord.ui.Button, interaction: discord.Interaction):
-        search = await WorldRecords.find_one({"message_id": self.message.id})
+    async def _resolve(self, interaction: discord.Interaction, verified: bool):
+        # Answer within Discord's 3 second window, the rest can take longer.
+        await interaction.response.defer()
+        search = await WorldRecords.find_one({"message_id": interaction.message.id})
+        if search is None:
+            await interaction.message.edit(content="Verification error", view=None)
+            return None
+
         guild = self.bot.get_guild(constants_bot.GUILD_ID)
         hidden_channel = guild.get_channel(constants_bot.HIDDEN_VERIFICATION_CHANNEL)
         try:
-            hidden_msg = await hidden_channel.fetch_message(search.hidden_id)
-            await hidden_msg.delete()
+            await hidden_channel.get_partial_message(search.hidden_id).delete()
         except discord.HTTPException:
             pass
 
-        search.verified = True
-        self.verify = True
-        self.clear_items()
+        search.verified = verified
+        search.rejected = not verified
         await search.commit()
-        self.stop()
+        await records_changed(
+            search.code, normalize_level(search.level), search.posted_by
+        )
+        return search
 
-    @discord.ui.button(label="Reject", style=discord.ButtonStyle.red)
+    @discord.ui.button(
+        label="Verify", style=discord.ButtonStyle.green, custom_id="verification:verify"
+    )
+    async def verify(self, button: discord.ui.Button, interaction: discord.Interaction):
+        search = await self._resolve(interaction, True)
+        if search is None:
+            return
+        rank = await WorldRecords.rank(
+            search.code, search.level_key, search.record, verified=True
+        )
+        await interaction.message.edit(
+            content=f"Verified. Rank {rank} on the verified scoreboard.", view=None
+        )
+        await interaction.message.add_reaction(emoji="<:upper:787788134620332063>")
+
+    @discord.ui.button(
+        label="Reject", style=discord.ButtonStyle.red, custom_id="verification:reject"
+    )
     async def reject(self, button: discord.ui.Button, interaction: discord.Interaction):
-        search = await WorldRecords.find_one({"message_id": self.message.id})
-        guild = self.bot.get_guild(constants_bot.GUILD_ID)
-        hidden_channel = guild.get_channel(constants_bot.HIDDEN_VERIFICATION_CHANNEL)
-        try:
-            hidden_msg = await hidden_channel.fetch_message(search.hidden_id)
-            await hidden_msg.delete()
-        except discord.HTTPException:
-            pass
+        if await self._resolve(interaction, False) is None:
+            return
+        await interaction.message.edit(content="Verification rejected", view=None)
+
+
+class VerificationQueue(discord.ui.View):
+    """Pick submissions from one page of the verification queue to act on at once."""
+
+    def __init__(self, author: discord.Member, records: List[dict]):
+        super().__init__(timeout=300)
+        self.author = author
+        self.records = records
+        self.selected = []
+        self.action = None
+        self.select_records.options = [
+            discord.SelectOption(
+                label=f"{i}. {r['name']} | {r['code']} | {r['level']}"[:100],
+                value=str(r["_id"]),
+            )
+            for i, r in enumerate(records, start=1)
+        ]
+        self.select_records.max_values = len(records)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user == self.author:
+            return True
+        return False
 
-        search.verified = False
-        self.verify = False
+    async def _finish(self, interaction: discord.Interaction, action, records):
+        if not records:
+            await interaction.response.send_message(
+                "Select at least one submission first.", ephemeral=True
+            )
+            return
+        self.action = action
+        self.selected = records
         self.clear_items()
-        await search.commit()
+        await interaction.response.edit_message(view=self)
+        self.stop()
+
+    @discord.ui.select(placeholder="Choose submissions", min_values=1)
+    async def select_records(
+        self, select: discord.ui.select, interaction: discord.Interaction
+    ):
+        self.selected = [r for r in self.records if str(r["_id"]) in select.values]
+        await interaction.response.defer()
+
+    @discord.ui.button(label="Verify selected", style=discord.ButtonStyle.green)
+    async def verify_selected(
+        self, button: discord.ui.Button, interaction: discord.Interaction
+    ):
+        await self._finish(interaction, "verify", self.selected)
+
+    @discord.ui.button(label="Reject selected", style=discord.ButtonStyle.red)
+    async def reject_selected(
+        self, button: discord.ui.Button, interaction: discord.Interaction
+    ):
+        await self._finish(interaction, "reject", self.selected)
+
+    @discord.ui.button(label="Verify page", style=discord.ButtonStyle.green)
+    async def verify_page(
+        self, button: discord.ui.Button, interaction: discord.Interaction
+    ):
+        await self._finish(interaction, "verify", self.records)
+
+    @discord.ui.button(label="Next page", style=discord.ButtonStyle.grey)
+    async def next_page(
+        self, button: discord.ui.Button, interaction: discord.Interaction
+    ):
+        self.action = "next"
+        await interaction.response.defer()
+        self.stop()
+
+    @discord.ui.button(label="Close", style=discord.ButtonStyle.grey)
+    async def close(self, button: discord.ui.Button, interaction: discord.Interaction):
+        await interaction.response.defer()
         self.stop()
 
 